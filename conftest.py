@@ -1,4 +1,6 @@
 # SPDX-License-Identifier: GPL-2.0+
+import threading
+
 import mock
 import pytest
 
@@ -11,5 +13,6 @@ def set_environment_variable(monkeypatch):
 @pytest.fixture
 def koji_proxy():
     mock_proxy = mock.Mock()
-    with mock.patch('greenwave.resources.get_server_proxy', return_value=mock_proxy):
+    with mock.patch('greenwave.resources.get_server_proxy', return_value=mock_proxy), \
+            mock.patch('greenwave.resources._thread_data', threading.local()):
         yield mock_proxy
@@ -22,7 +22,11 @@ CACHE = {
                            # service is working
     'arguments': {
         'url': 'memcached:11211',
-        'distributed_lock': True
+        'distributed_lock': True,
+        # Let memcached evict stale keys itself, but keep them a bit longer
+        # than expiration_time so the old value can be served while a new
+        # one is being generated.
+        'memcached_expire_time': 5,
     }
 }
 LOGGING = {
@@ -2,6 +2,7 @@
 
 import logging
 import logging.config
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import Flask
 from greenwave.api_v1 import api, landing_page
@@ -44,6 +45,9 @@ def create_app(config_obj=None):
             '{DIST_GIT_BASE_URL}', app.config['DIST_GIT_BASE_URL']
         )
 
+    app.config['DISTINCT_LATEST_RESULTS_ON_JOINED'] = ','.join(
+        app.config['DISTINCT_LATEST_RESULTS_ON'])
+
     # register error handlers
     for code in default_exceptions.keys():
         app.register_error_handler(code, json_error)
@@ -60,6 +64,12 @@ def create_app(config_obj=None):
     app.cache = make_region(key_mangler=mangle_key)
     app.cache.configure(**app.config['CACHE'])
 
+    # Long-lived worker threads keep their requests sessions (and connections)
+    # between decisions.
+    app.results_executor = ThreadPoolExecutor(
+        max_workers=app.config['RESULTS_PREFETCH_MAX_WORKERS'],
+        thread_name_prefix='greenwave-results')
+
     return app
 
 
@@ -16,3 +16,18 @@ def cached(fn):
         decorator = decoration(function_key_generator=key_generator)
         return decorator(fn)(*args)
     return wrapper
+
+
+def get_cached_multi(fn, args_list):
+    """ Returns keys and values cached by a @cached function for arguments.
+
+    Missing values are dogpile.cache.api.NO_VALUE.
+    """
+    generate_key = key_generator(None, fn.__wrapped__)
+    keys = [generate_key(*args) for args in args_list]
+    return keys, flask.current_app.cache.get_multi(keys)
+
+
+def set_cached_multi(mapping):
+    """ Stores values for keys returned by get_cached_multi(). """
+    flask.current_app.cache.set_multi(mapping)
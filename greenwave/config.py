@@ -36,10 +36,16 @@ class Config(object):
         '*': 'https://src.fedoraproject.org/{pkg_namespace}{pkg_name}/raw/{rev}/f/gating.yaml'
     }
     REMOTE_RULE_GIT_TIMEOUT = 30
+    # Maximum size of a remote rule file in bytes
+    REMOTE_RULE_MAX_SIZE = 1024 * 1024
     KOJI_BASE_URL = 'https://koji.fedoraproject.org/kojihub'
     # Options for outbound HTTP requests made by python-requests
     REQUESTS_TIMEOUT = (6.1, 15)
     REQUESTS_VERIFY = True
+    # Maximum number of decisions computed concurrently by a message consumer
+    DECISION_MAX_WORKERS = 8
+    # Maximum number of subjects to retrieve results for concurrently
+    RESULTS_PREFETCH_MAX_WORKERS = 16
 
     POLICIES_DIR = '/etc/greenwave/policies'
     SUBJECT_TYPES_DIR = '/etc/greenwave/subject_types'
@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: GPL-2.0+
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 import fedora_messaging.api
@@ -84,6 +86,12 @@ class Consumer:
 
         self.flask_app = greenwave.app_factory.create_app(config)
         self.greenwave_api_url = self.flask_app.config['GREENWAVE_API_URL']
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.flask_app.config['DECISION_MAX_WORKERS'],
+            thread_name_prefix='greenwave-decision',
+        )
+        self._indexed_policies = None
+        self._policies_by_subject_type = {}
         log.info('Greenwave handler listening on: %s', self.topic)
 
     def consume(self, message):
@@ -131,16 +139,49 @@ class Consumer:
             log.exception('Error sending fedora-messaging message')
             self._inc(messaging_tx_failed_counter)
 
-    def _old_and_new_decisions(self, submit_time, **request_data):
-        """Returns decision before and after submit time."""
-        greenwave_url = self.greenwave_api_url + '/decision'
-        log.debug('querying greenwave at: %s', greenwave_url)
+    def _subject_type_policies(self, subject):
+        """
+        Returns policies matching the subject type.
+
+        The policies are indexed by subject type on first use so that
+        messages do not need to scan policies for other subject types.
+        """
+        policies = self.flask_app.config['policies']
+        if policies is not self._indexed_policies:
+            self._indexed_policies = policies
+            self._policies_by_subject_type = {}
 
         try:
-            decision = greenwave.decision.make_decision(request_data, self.flask_app.config)
+            return self._policies_by_subject_type[subject.type]
+        except KeyError:
+            subject_type_policies = [
+                policy for policy in policies
+                if policy.matches_subject_type(subject=subject)
+            ]
+            self._policies_by_subject_type[subject.type] = subject_type_policies
+            return subject_type_policies
+
+    def _make_decision(self, request_data):
+        with self.flask_app.app_context():
+            return greenwave.decision.make_decision(request_data, self.flask_app.config)
+
+    def _submit_old_and_new_decisions(self, when, request_data):
+        """
+        Schedules computing decision at the given time and the current one.
 
-            request_data['when'] = right_before_this_time(submit_time)
-            old_decision = greenwave.decision.make_decision(request_data, self.flask_app.config)
+        Returns futures for the old and the new decision.
+        """
+        old_request_data = dict(request_data, when=when)
+        return (
+            self._executor.submit(self._make_decision, old_request_data),
+            self._executor.submit(self._make_decision, request_data),
+        )
+
+    def _old_and_new_decisions(self, old_future, future, request_data):
+        """Returns decision before and after submit time."""
+        try:
+            decision = future.result()
+            old_decision = old_future.result()
             log.debug('old decision: %s', old_decision)
         except requests.exceptions.HTTPError as e:
             log.exception('Failed to retrieve decision for data=%s, error: %s', request_data, e)
@@ -164,18 +205,31 @@ class Consumer:
         if product_version:
             policy_attributes['product_version'] = product_version
 
-        policies = self.flask_app.config['policies']
+        policies = self._subject_type_policies(subject)
         contexts_product_versions = applicable_decision_context_product_version_pairs(
             policies, **policy_attributes)
 
-        for decision_context, product_version in sorted(contexts_product_versions):
-            old_decision, decision = self._old_and_new_decisions(
-                submit_time,
+        when = right_before_this_time(submit_time)
+        subject_data = dict(
+            subject_type=subject.type,
+            subject_identifier=subject.identifier,
+        )
+
+        # Compute all decisions concurrently, then process them in order.
+        decision_futures = []
+        for decision_context, product_version in contexts_product_versions:
+            request_data = dict(
+                subject_data,
                 decision_context=decision_context,
                 product_version=product_version,
-                subject_type=subject.type,
-                subject_identifier=subject.identifier,
             )
+            futures = self._submit_old_and_new_decisions(when, request_data)
+            decision_futures.append((request_data, futures))
+
+        for request_data, futures in decision_futures:
+            decision_context = request_data['decision_context']
+            product_version = request_data['product_version']
+            old_decision, decision = self._old_and_new_decisions(*futures, request_data)
             if decision is None:
                 self._inc(decision_failed_counter.labels(decision_context=decision_context))
                 continue
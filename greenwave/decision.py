@@ -12,8 +12,13 @@ from werkzeug.exceptions import (
 from greenwave.policies import (
     summarize_answers,
     OnDemandPolicy,
+    RemoteRule,
+)
+from greenwave.resources import (
+    ResultsRetriever,
+    WaiversRetriever,
+    prefetch_koji_builds,
 )
-from greenwave.resources import ResultsRetriever, WaiversRetriever
 from greenwave.subjects.factory import (
     create_subject,
     create_subject_from_data,
@@ -90,11 +95,13 @@ class Decision:
         if self.verbose:
             # Retrieve test results and waivers for all items when verbose output is requested.
             self.verbose_results.extend(results_retriever.retrieve(subject))
-            self.waiver_filters.append(dict(
+            waiver_filter = dict(
                 subject_type=subject.type,
                 subject_identifier=subject.identifier,
                 product_version=self.product_version,
-            ))
+            )
+            if waiver_filter not in self.waiver_filters:
+                self.waiver_filters.append(waiver_filter)
 
         rule_context = RuleContext(
             decision_context=self.decision_context,
@@ -176,6 +183,24 @@ def _decision_subjects_for_request(data):
         yield create_subject(data['subject_type'], data['subject_identifier'])
 
 
+def _has_remote_rules(policies, decision_contexts, product_version, subjects):
+    """
+    Returns True if any policy applicable to the subjects has a remote rule.
+    """
+    return any(
+        any(isinstance(rule, RemoteRule) for rule in policy.rules) and
+        any(
+            policy.matches(
+                decision_context=decision_contexts,
+                product_version=product_version,
+                match_any_remote_rule=True,
+                subject=subject)
+            for subject in subjects
+        )
+        for policy in policies
+    )
+
+
 @tracer.start_as_current_span("make_decision")
 def make_decision(data, config):
     if not data:
@@ -230,9 +255,23 @@ def make_decision(data, config):
         url=config['WAIVERDB_API_URL'],
         **retriever_args)
 
+    subjects = list(_decision_subjects_for_request(data))
+    if verbose and len(subjects) > 1:
+        # All results are retrieved for each subject in verbose mode.
+        results_retriever.prefetch(subjects)
+
     policies = on_demand_policies or config['policies']
+
+    koji_url = config.get('KOJI_BASE_URL')
+    koji_subjects = [subject for subject in subjects if subject.is_koji_build]
+    koji_nvrs = [subject.identifier for subject in koji_subjects]
+    if koji_url and len(koji_nvrs) > 1 and _has_remote_rules(
+            policies, decision_contexts, product_version, koji_subjects):
+        # Remote rule URLs are usually based on the Koji build source.
+        prefetch_koji_builds(koji_nvrs, koji_url)
+
     decision = Decision(decision_contexts, product_version, verbose)
-    for subject in _decision_subjects_for_request(data):
+    for subject in subjects:
         decision.check(subject, policies, results_retriever)
 
     decision.waive_answers(waivers_retriever)
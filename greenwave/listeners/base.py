@@ -272,7 +272,7 @@ class BaseListener(stomp.ConnectionListener):
             policies, **policy_attributes
         )
 
-        for decision_context, product_version in sorted(contexts_product_versions):
+        for decision_context, product_version in contexts_product_versions:
             old_decision, decision = self._old_and_new_decisions(
                 submit_time,
                 decision_context=decision_context,
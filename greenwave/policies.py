@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: GPL-2.0+
 
-from collections import defaultdict
-from fnmatch import fnmatch
+from collections import OrderedDict, defaultdict
+from fnmatch import translate
 import glob
+import hashlib
 import logging
 import os
 import re
-from typing import Optional
+import threading
+from typing import FrozenSet, NamedTuple, Optional, Tuple
 
 from werkzeug.exceptions import BadGateway, BadRequest, NotFound
 from flask import current_app
@@ -24,6 +26,16 @@ from greenwave.safe_yaml import (
 log = logging.getLogger(__name__)
 
 
+def _compile_fnmatch_patterns(patterns):
+    """
+    Returns a compiled regular expression matching any of the given
+    shell-style wildcard patterns, same as fnmatch.fnmatch().
+    """
+    if not patterns:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(translate(pattern) for pattern in patterns))
+
+
 def load_policies(policies_dir):
     """
     Load Greenwave policies from the given policies directory.
@@ -107,6 +119,8 @@ class Answer(object):
     a subclass, depending on what the answer was.
     """
 
+    __slots__ = ()
+
     is_test_result = True
 
     def to_json(self):
@@ -125,6 +139,8 @@ class RuleSatisfied(Answer):
     The rule's requirements are satisfied for this item.
     """
 
+    __slots__ = ()
+
     is_satisfied = True
 
     def to_json(self):
@@ -139,6 +155,8 @@ class RuleNotSatisfied(Answer):
     exactly what was not satisfied.
     """
 
+    __slots__ = ()
+
     is_satisfied = False
     summary_text = "unexpected unsatisfied requirement{s}"
 
@@ -161,6 +179,8 @@ class TestResultMissing(RuleNotSatisfied):
     ResultsDB with a matching item and test case name).
     """
 
+    __slots__ = ('subject', 'test_case_name', 'scenario', 'source')
+
     summary_text = "result{s} missing"
 
     def __init__(self, subject, test_case_name, scenario, source):
@@ -192,6 +212,8 @@ class TestResultIncomplete(RuleNotSatisfied):
     result outcomes in ResultsDB with a matching item and test case name).
     """
 
+    __slots__ = ('subject', 'test_case_name', 'source', 'result_id', 'data')
+
     summary_text = "test{s} incomplete"
 
     def __init__(self, subject, test_case_name, source, result_id, data):
@@ -232,6 +254,9 @@ class TestResultWaived(RuleSatisfied):
     Contains same data as unsatisfied rule except the type has "-waived"
     suffix. Also, the deprecated "item" field is dropped.
     """
+
+    __slots__ = ('unsatisfied_rule', 'waiver_id')
+
     def __init__(self, unsatisfied_rule, waiver_id):
         self.unsatisfied_rule = unsatisfied_rule
         self.waiver_id = waiver_id
@@ -253,6 +278,8 @@ class TestResultFailed(RuleNotSatisfied):
     not passing).
     """
 
+    __slots__ = ('subject', 'test_case_name', 'source', 'result_id', 'data')
+
     summary_text = "test{s} failed"
 
     def __init__(self, subject, test_case_name, source, result_id, data):
@@ -294,6 +321,8 @@ class TestResultErrored(RuleNotSatisfied):
     was an error).
     """
 
+    __slots__ = ('subject', 'test_case_name', 'source', 'result_id', 'data', 'error_reason')
+
     summary_text = "test{s} errored"
 
     def __init__(
@@ -342,6 +371,8 @@ class InvalidRemoteRuleYaml(RuleNotSatisfied):
     Remote policy parsing failed.
     """
 
+    __slots__ = ('subject', 'test_case_name', 'details', 'source')
+
     scenario = None
     is_test_result = False
     summary_text = "error{s} due to invalid remote rule file"
@@ -372,6 +403,8 @@ class MissingRemoteRuleYaml(RuleNotSatisfied):
     Remote policy not found in remote repository.
     """
 
+    __slots__ = ('subject', 'sources')
+
     test_case_name = 'missing-gating-yaml'
     scenario = None
     is_test_result = False
@@ -400,6 +433,8 @@ class FailedFetchRemoteRuleYaml(RuleNotSatisfied):
     Error while fetching remote policy.
     """
 
+    __slots__ = ('subject', 'sources', 'error')
+
     test_case_name = 'failed-fetch-gating-yaml'
     scenario = None
     is_test_result = False
@@ -430,6 +465,8 @@ class FetchedRemoteRuleYaml(RuleSatisfied):
     Remote policy was found in remote repository.
     """
 
+    __slots__ = ('subject', 'source')
+
     is_test_result = False
 
     def __init__(self, subject, source):
@@ -451,6 +488,9 @@ class TestResultPassed(RuleSatisfied):
     A required test case passed (that is, its outcome in ResultsDB was passing)
     or a corresponding waiver was found.
     """
+
+    __slots__ = ('subject', 'test_case_name', 'source', 'result_id', 'data')
+
     def __init__(self, subject, test_case_name, source, result_id, data):
         self.subject = subject
         self.test_case_name = test_case_name
@@ -476,6 +516,8 @@ class ExcludedInPolicy(RuleSatisfied):
     Package was excluded in policy.
     """
 
+    __slots__ = ('subject_identifier', 'policy')
+
     is_test_result = False
 
     def __init__(self, subject_identifier, policy):
@@ -598,6 +640,45 @@ class Rule(SafeYAMLObject):
         return self.to_json() == other.to_json()
 
 
+# Parsed remote rule files, keyed by URL and digest of the file content.
+_REMOTE_POLICIES_CACHE_SIZE = 32
+_remote_policies_cache: 'OrderedDict[Tuple[str, bytes], Tuple[RemotePolicy, ...]]' = \
+    OrderedDict()
+_remote_policies_cache_lock = threading.Lock()
+
+
+def _load_remote_policies(url, content):
+    """
+    Parses policies from remote rule file content fetched from the URL.
+
+    Recently parsed policies are reused for the same URL and content. The
+    policies are not modified after loading, so they can be shared.
+    """
+    if isinstance(content, str):
+        digest = hashlib.sha256(content.encode()).digest()
+    else:
+        digest = hashlib.sha256(content).digest()
+    key = (url, digest)
+
+    with _remote_policies_cache_lock:
+        policies = _remote_policies_cache.get(key)
+        if policies is not None:
+            _remote_policies_cache.move_to_end(key)
+            return policies
+
+    loaded = RemotePolicy.safe_load_all(content)
+    for policy in loaded:
+        policy.source = url
+    policies = tuple(loaded)
+
+    with _remote_policies_cache_lock:
+        _remote_policies_cache[key] = policies
+        while len(_remote_policies_cache) > _REMOTE_POLICIES_CACHE_SIZE:
+            _remote_policies_cache.popitem(last=False)
+
+    return policies
+
+
 class RemoteRule(Rule):
     yaml_tag = '!RemoteRule'
     safe_yaml_attributes = {
@@ -645,16 +726,13 @@ class RemoteRule(Rule):
         answers.append(FetchedRemoteRuleYaml(subject, remote_policies_url))
 
         try:
-            policies = RemotePolicy.safe_load_all(response)
+            policies = _load_remote_policies(remote_policies_url, response)
         except SafeYAMLError as e:
             answers.append(
                 InvalidRemoteRuleYaml(
                     subject, 'invalid-gating-yaml', str(e), remote_policies_url))
             policies = []
 
-        for sub_policy in policies:
-            sub_policy.source = remote_policies_url
-
         sub_policies = [
             sub_policy for sub_policy in policies
             if policy.matches_sub_policy(sub_policy)
@@ -830,6 +908,14 @@ class FedoraAtomicCi(PackageSpecificBuild):
     yaml_tag = '!FedoraAtomicCi'
 
 
+class _PolicyMatchers(NamedTuple):
+    product_versions_re: re.Pattern
+    packages_re: re.Pattern
+    excluded_packages_re: re.Pattern
+    test_case_names: FrozenSet[str]
+    other_rules: Tuple[Rule, ...]
+
+
 class Policy(SafeYAMLObject):
     root_yaml_tag: Optional[str] = '!Policy'
 
@@ -848,6 +934,8 @@ class Policy(SafeYAMLObject):
 
     source = None
 
+    _matchers_cache = None
+
     def validate(self):
         if not self.decision_context and not self.decision_contexts:
             raise SafeYAMLError('No decision contexts provided')
@@ -856,6 +944,31 @@ class Policy(SafeYAMLObject):
                 'Both properties "decision_contexts" and "decision_context" were set'
             )
         super().validate()
+        self._matchers()
+
+    def _matchers(self):
+        """
+        Returns compiled patterns and the rule index used for matching.
+
+        These are created when the policy is loaded (or on first use for
+        policies not created from YAML) and assigned at once, so the policy
+        can be shared by multiple threads.
+        """
+        matchers = self._matchers_cache
+        if matchers is None:
+            matchers = _PolicyMatchers(
+                product_versions_re=_compile_fnmatch_patterns(self.product_versions),
+                packages_re=_compile_fnmatch_patterns(self.packages),
+                excluded_packages_re=_compile_fnmatch_patterns(self.excluded_packages),
+                test_case_names=frozenset(
+                    rule.test_case_name for rule in self.rules
+                    if isinstance(rule, PassingTestCaseRule)),
+                other_rules=tuple(
+                    rule for rule in self.rules
+                    if not isinstance(rule, PassingTestCaseRule)),
+            )
+            self._matchers_cache = matchers
+        return matchers
 
     def matches(self, **attributes):
         """
@@ -881,7 +994,19 @@ class Policy(SafeYAMLObject):
         if not self.matches_subject_type(**attributes):
             return False
 
-        return not self.rules or any(rule.matches(self, **attributes) for rule in self.rules)
+        if not self.rules:
+            return True
+
+        # PassingTestCaseRule matches only by test case name, so skip all of
+        # these rules if none has the requested test case name.
+        matchers = self._matchers()
+        testcase = attributes.get('testcase')
+        if testcase and testcase not in matchers.test_case_names:
+            rules = matchers.other_rules
+        else:
+            rules = self.rules
+
+        return any(rule.matches(self, **attributes) for rule in rules)
 
     def matches_subject_type(self, **attributes):
         subject = attributes.get('subject')
@@ -893,10 +1018,10 @@ class Policy(SafeYAMLObject):
     def check(self, rule_context):
         name = rule_context.subject.package_name
         if name:
-            for exclude in self.excluded_packages:
-                if fnmatch(name, exclude):
-                    return [ExcludedInPolicy(rule_context.subject.identifier, self)]
-            if self.packages and not any(fnmatch(name, package) for package in self.packages):
+            matchers = self._matchers()
+            if matchers.excluded_packages_re.match(name):
+                return [ExcludedInPolicy(rule_context.subject.identifier, self)]
+            if self.packages and not matchers.packages_re.match(name):
                 # If the `packages` allowlist is set and this package isn't in the
                 # `packages` allowlist, then the policy doesn't apply to it
                 return []
@@ -907,7 +1032,7 @@ class Policy(SafeYAMLObject):
         return answers
 
     def matches_product_version(self, product_version):
-        return any(fnmatch(product_version, version) for version in self.product_versions)
+        return self._matchers().product_versions_re.match(product_version) is not None
 
     @property
     def safe_yaml_label(self):
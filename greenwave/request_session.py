@@ -39,8 +39,9 @@ class RequestsSession(requests.Session):
 
         kwargs.setdefault('headers', {'Content-Type': 'application/json'})
         if has_app_context():
-            kwargs.setdefault('timeout', current_app.config['REQUESTS_TIMEOUT'])
-            kwargs.setdefault('verify', current_app.config['REQUESTS_VERIFY'])
+            config = current_app.config
+            kwargs.setdefault('timeout', config['REQUESTS_TIMEOUT'])
+            kwargs.setdefault('verify', config['REQUESTS_VERIFY'])
 
         try:
             ret_val = super().request(*args, **kwargs)
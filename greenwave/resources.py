@@ -8,39 +8,61 @@ waiverdb, etc..).
 
 import datetime
 import logging
-import re
 import socket
 import threading
-from typing import List, Optional
+from typing import FrozenSet, Iterable, Optional
 
 from dateutil import tz
 from dateutil.parser import parse
 from defusedxml.xmlrpc import xmlrpc_client
+from dogpile.cache.api import NO_VALUE
 from urllib.parse import urlparse
-from flask import current_app
+from flask import current_app, g
 from opentelemetry import trace
+from requests.exceptions import RequestException
 from werkzeug.exceptions import BadGateway, NotFound
 
-from greenwave.cache import cached
+from greenwave.cache import cached, get_cached_multi, set_cached_multi
 from greenwave.request_session import get_requests_session
 from greenwave.xmlrpc_server_proxy import get_server_proxy
 
 log = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
 
-requests_session = threading.local().requests_session = get_requests_session()
+_thread_data = threading.local()
+
+
+def _requests_session():
+    """
+    Returns per-thread cached requests session.
+    """
+    try:
+        return _thread_data.requests_session
+    except AttributeError:
+        session = get_requests_session()
+        _thread_data.requests_session = session
+        return session
 
 
 def _koji(uri: str):
     """
     Returns per-thread cached XMLRPC server proxy object for Koji.
+
+    The proxy keeps the HTTP connection alive between calls.
     """
-    data = threading.local()
     try:
-        return data.koji_server_proxy_cache
+        proxies = _thread_data.koji_server_proxies
     except AttributeError:
-        proxy = get_server_proxy(uri, _requests_timeout())
-        data.koji_server_proxy_cache = proxy
+        proxies = {}
+        _thread_data.koji_server_proxies = proxies
+
+    timeout = _requests_timeout()
+    key = (uri, timeout)
+    try:
+        return proxies[key]
+    except KeyError:
+        proxy = get_server_proxy(uri, timeout)
+        proxies[key] = proxy
         return proxy
 
 
@@ -64,22 +86,27 @@ def _raise_for_status(response):
 
 
 class BaseRetriever:
-    ignore_ids: List[int]
+    ignore_ids: FrozenSet[int]
     url: str
     since: Optional[str]
+    until: Optional[str]
 
-    def __init__(self, ignore_ids: List[int], when: str, url: str):
-        self.ignore_ids = ignore_ids
+    def __init__(self, ignore_ids: Iterable[int], when: str, url: str):
+        self.ignore_ids = frozenset(ignore_ids or ())
         self.url = url
 
         if when:
             self.since = '1900-01-01T00:00:00.000000,{}'.format(when)
+            self.until = when
         else:
             self.since = None
+            self.until = None
 
     @tracer.start_as_current_span("retrieve")
     def retrieve(self, *args, **kwargs):
         items = self._retrieve_all(*args, **kwargs)
+        if not self.ignore_ids:
+            return items
         return [item for item in items if item['id'] not in self.ignore_ids]
 
     def _retrieve_data(self, params):
@@ -95,9 +122,9 @@ class ResultsRetriever(BaseRetriever):
 
     def __init__(self, **args):
         super().__init__(**args)
-        self._distinct_on = ','.join(
-            current_app.config['DISTINCT_LATEST_RESULTS_ON'])
+        self._distinct_on = current_app.config['DISTINCT_LATEST_RESULTS_ON_JOINED']
         self.cache = {}
+        self._query_cache = {}
 
     def _retrieve_all(self, subject, testcase=None):
         # Get test case result from cache if all test case results were already
@@ -120,14 +147,20 @@ class ResultsRetriever(BaseRetriever):
             '_distinct_on': self._distinct_on
         }
         if self.since:
-            params.update({'since': self.since})
+            params['since'] = self.since
         if testcase:
             params.update({'testcases': testcase})
 
+        # ResultsDB combines filters with AND, so alternative identifiers
+        # need separate queries; skip results matched by more than one.
         results = []
+        result_ids = set()
         for query in subject.result_queries():
             query.update(params)
-            results.extend(self._retrieve_data(query))
+            for result in self._retrieve_query(query):
+                if result['id'] not in result_ids:
+                    result_ids.add(result['id'])
+                    results.append(result)
 
         if not testcase:
             self.cache[cache_key] = results
@@ -141,17 +174,40 @@ class ResultsRetriever(BaseRetriever):
 
         return results
 
+    def prefetch(self, subjects):
+        """
+        Retrieves all results for given subjects concurrently so that
+        following retrieve() calls for the subjects reuse the responses.
+        """
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+
+        def retrieve_all(subject):
+            with app.app_context():
+                self._retrieve_all(subject)
+
+        list(app.results_executor.map(retrieve_all, subjects))
+
+    def _retrieve_query(self, query):
+        """
+        Returns results for a query, sharing identical queries across
+        subjects retrieved by this instance.
+        """
+        key = tuple(sorted(query.items()))
+        if key not in self._query_cache:
+            self._query_cache[key] = self._retrieve_data(query)
+        return self._query_cache[key]
+
     def _make_request(self, params, **request_args):
-        return requests_session.get(
+        return _requests_session().get(
             self.url + '/results/latest',
             params=params,
             **request_args)
 
     def _results_match_time(self, results):
-        if not self.since:
+        if not self.until:
             return True
 
-        until = self.since.split(',')[1]
+        until = self.until
         return all(result['submit_time'] < until for result in results)
 
     def get_external_cache(self, key):
@@ -169,12 +225,12 @@ class WaiversRetriever(BaseRetriever):
     def _retrieve_all(self, filters):
         if self.since:
             for filter_ in filters:
-                filter_.update({'since': self.since})
+                filter_['since'] = self.since
         waivers = self._retrieve_data(filters)
         return [waiver for waiver in waivers if waiver['waived']]
 
     def _make_request(self, params, **request_args):
-        return requests_session.post(
+        return _requests_session().post(
             self.url + '/waivers/+filtered',
             json={'filters': params},
             **request_args)
@@ -227,6 +283,10 @@ def _retrieve_koji_build_attributes(nvr: str, koji_url: str):
             'Failed to find Koji build for "{}" at "{}"'.format(nvr, koji_url)
         )
 
+    return _koji_build_attributes_from_build(build)
+
+
+def _koji_build_attributes_from_build(build):
     task_id = build.get("task_id")
 
     source = build.get("source")
@@ -241,16 +301,80 @@ def _retrieve_koji_build_attributes(nvr: str, koji_url: str):
     return (task_id, source, creation_time)
 
 
+def _koji_build_attributes(nvr: str, koji_url: str):
+    """
+    Returns Koji build attributes cached for the current application context.
+    """
+    attributes = g.setdefault('koji_build_attributes', {})
+    key = (nvr, koji_url)
+    if key not in attributes:
+        attributes[key] = _retrieve_koji_build_attributes(nvr, koji_url)
+    return attributes[key]
+
+
+def prefetch_koji_builds(nvrs: Iterable[str], koji_url: str):
+    """
+    Retrieves multiple Koji builds with a single multicall and keeps their
+    attributes for the current application context and in the cache.
+
+    Only builds missing in the cache are retrieved from Koji. Builds which
+    fail to be retrieved are skipped here, these are retrieved again
+    separately when needed.
+    """
+    attributes = g.setdefault('koji_build_attributes', {})
+    nvrs = [nvr for nvr in nvrs if (nvr, koji_url) not in attributes]
+    if not nvrs:
+        return
+
+    keys, values = get_cached_multi(
+        _retrieve_koji_build_attributes, [(nvr, koji_url) for nvr in nvrs])
+    cache_keys = {}
+    for nvr, key, value in zip(nvrs, keys, values):
+        if value is NO_VALUE:
+            cache_keys[nvr] = key
+        else:
+            attributes[(nvr, koji_url)] = value
+
+    nvrs = list(cache_keys)
+    if len(nvrs) < 2:
+        return
+
+    log.debug('Getting Koji builds %r', nvrs)
+    multicall = xmlrpc_client.MultiCall(_koji(koji_url))
+    for nvr in nvrs:
+        multicall.getBuild(nvr)
+
+    try:
+        builds = multicall()
+    except (xmlrpc_client.Error, socket.error) as e:
+        log.warning('Failed to get Koji builds: %s', e)
+        return
+
+    retrieved = {}
+    for i, nvr in enumerate(nvrs):
+        try:
+            build = builds[i]
+        except (xmlrpc_client.Fault, IndexError):
+            continue
+        if build:
+            value = _koji_build_attributes_from_build(build)
+            attributes[(nvr, koji_url)] = value
+            retrieved[cache_keys[nvr]] = value
+
+    if retrieved:
+        set_cached_multi(retrieved)
+
+
 def retrieve_koji_build_task_id(nvr: str, koji_url: str):
-    return _retrieve_koji_build_attributes(nvr, koji_url)[0]
+    return _koji_build_attributes(nvr, koji_url)[0]
 
 
 def retrieve_koji_build_source(nvr: str, koji_url: str):
-    return _retrieve_koji_build_attributes(nvr, koji_url)[1]
+    return _koji_build_attributes(nvr, koji_url)[1]
 
 
 def retrieve_koji_build_creation_time(nvr: str, koji_url: str):
-    creation_time = _retrieve_koji_build_attributes(nvr, koji_url)[2]
+    creation_time = _koji_build_attributes(nvr, koji_url)[2]
     try:
         time = parse(str(creation_time))
         if time.tzinfo is None:
@@ -297,8 +421,9 @@ def retrieve_scm_from_koji_build(nvr: str, source: str, koji_url: str):
             '(missing URL fragment with SCM revision information)'.format(source, nvr, koji_url)
         )
 
-    pkg_name = url.path.split('/')[-1]
-    pkg_name = re.sub(r'\.git$', '', pkg_name)
+    pkg_name = path_components[-1]
+    if pkg_name.endswith('.git'):
+        pkg_name = pkg_name[:-4]
     return namespace, pkg_name, rev
 
 
@@ -306,12 +431,32 @@ def retrieve_scm_from_koji_build(nvr: str, source: str, koji_url: str):
 def retrieve_yaml_remote_rule(url: str):
     """ Retrieve a remote rule file content from the git web UI. """
     timeout = current_app.config['REMOTE_RULE_GIT_TIMEOUT']
-    response = requests_session.get(url, timeout=timeout)
+    max_size = current_app.config['REMOTE_RULE_MAX_SIZE']
+    # Plain file download, skip the default JSON Content-Type header.
+    response = _requests_session().get(url, headers={}, timeout=timeout, stream=True)
 
     if response.status_code == 404:
         log.debug('Remote rule not found: %s', url)
+        response.close()
         return None
 
     _raise_for_status(response)
 
-    return response.content
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > max_size:
+                response.close()
+                msg = f'Remote rule file {url} exceeds maximum size of {max_size} bytes'
+                log.error(msg)
+                raise BadGateway(msg)
+            chunks.append(chunk)
+    except RequestException as e:
+        response.close()
+        msg = f'Failed to read remote rule file {url}: {e}'
+        log.error(msg)
+        raise BadGateway(msg)
+
+    return b''.join(chunks)
@@ -8,6 +8,11 @@ from dateutil import tz
 from dateutil.parser import parse
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore
+
 safe_yaml_tag_to_class: Dict[str, object] = {}
 
 
@@ -241,7 +246,7 @@ class SafeYAMLObject(yaml.YAMLObject, metaclass=SafeYAMLObjectMetaclass):
     Define class attribute safe_yaml_attributes which is dict mapping attribute
     name to a SafeYAMLAttribute object.
     """
-    yaml_loader = yaml.SafeLoader
+    yaml_loader = SafeLoader
 
     safe_yaml_attributes: Dict[str, SafeYAMLAttribute]
 
@@ -1,7 +1,13 @@
 # SPDX-License-Identifier: GPL-2.0+
+import glob
+import os
+
+import mock
 import pytest
 
 from greenwave.app_factory import create_app
+from greenwave.config import TestingConfig
+from greenwave.policies import Policy, load_policies
 
 
 @pytest.fixture(autouse=True)
@@ -9,13 +15,70 @@ def mock_env_config(monkeypatch):
     monkeypatch.delenv('GREENWAVE_CONFIG', raising=False)
 
 
+@pytest.fixture(scope='session', autouse=True)
+def cached_app_policies():
+    """
+    Reuses policies loaded by create_app() within the test session as long as
+    the content of the policy files does not change.
+
+    Note that the same Policy objects are shared by all apps using the same
+    policy files.
+    """
+    cache = {}
+
+    def load(policies_dir):
+        paths = sorted(glob.glob(os.path.join(policies_dir, '*.yaml')))
+        contents = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+        key = (os.path.abspath(policies_dir), tuple(paths), tuple(contents))
+        if key not in cache:
+            cache[key] = load_policies(policies_dir)
+        return list(cache[key])
+
+    with mock.patch('greenwave.app_factory.load_policies', load):
+        yield
+
+
 @pytest.fixture
 def app():
-    app = create_app(config_obj='greenwave.config.TestingConfig')
+    app = create_app(config_obj=TestingConfig)
     with app.app_context():
         yield app
 
 
+@pytest.fixture(scope='module')
+def module_app():
+    """
+    Application shared by all tests in a module.
+
+    Tests need to push the application context themselves.
+    """
+    # Function-scoped fixtures setting up environment are not available here.
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('TEST', 'true')
+        monkeypatch.delenv('GREENWAVE_CONFIG', raising=False)
+        return create_app(config_obj=TestingConfig)
+
+
 @pytest.fixture
 def client(app):
     yield app.test_client()
+
+
+@pytest.fixture(scope='session')
+def cached_load_policies():
+    """
+    Returns function which parses policies from YAML text.
+
+    Policies parsed from the same text are reused within the test session.
+    """
+    cache = {}
+
+    def load(text):
+        if text not in cache:
+            cache[text] = Policy.safe_load_all(text)
+        return list(cache[text])
+
+    return load
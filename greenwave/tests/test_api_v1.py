@@ -6,6 +6,7 @@ import pytest
 from textwrap import dedent
 
 from greenwave.app_factory import create_app
+from greenwave.config import TestingConfig
 from greenwave.policies import Policy
 
 DEFAULT_DECISION_DATA = dict(
@@ -55,7 +56,7 @@ def mock_waivers():
 
 @pytest.fixture
 def make_decision():
-    app = create_app('greenwave.config.TestingConfig')
+    app = create_app(TestingConfig)
 
     def make_decision(policies=DEFAULT_DECISION_POLICIES, **kwargs):
         app.config['policies'] = Policy.safe_load_all(dedent(policies))
@@ -114,6 +115,54 @@ def test_make_decision_retrieves_waivers_once_on_verbose_and_missing(
     mock_waivers.assert_called_once()
 
 
+def test_make_decision_retrieves_waivers_in_single_request(
+        mock_results, mock_waivers, make_decision):
+    mock_results.return_value = []
+    mock_waivers.return_value = []
+    policies = """
+        --- !Policy
+        id: "test_policy"
+        product_versions:
+          - fedora-rawhide
+        decision_context: test_policies
+        subject_type: koji_build
+        rules:
+          - !PassingTestCaseRule {test_case_name: sometest}
+          - !PassingTestCaseRule {test_case_name: othertest}
+    """
+    subjects = [
+        {'type': 'koji_build', 'item': 'nethack-1.2.3-1.f31'},
+        {'type': 'koji_build', 'item': 'nethack-1.2.4-1.f31'},
+    ]
+    response = make_decision(policies=policies, subject=subjects)
+    assert 200 == response.status_code
+    assert 'Of 4 required tests, 4 results missing' == response.json['summary']
+    mock_waivers.assert_called_once()
+    filters = mock_waivers.call_args[0][0]
+    assert [(f['subject_identifier'], f['testcase']) for f in filters] == [
+        ('nethack-1.2.3-1.f31', 'sometest'),
+        ('nethack-1.2.3-1.f31', 'othertest'),
+        ('nethack-1.2.4-1.f31', 'sometest'),
+        ('nethack-1.2.4-1.f31', 'othertest'),
+    ]
+
+
+def test_make_decision_skips_duplicate_waiver_filters_on_verbose(
+        mock_results, mock_waivers, make_decision):
+    mock_results.return_value = []
+    mock_waivers.return_value = []
+    subjects = [
+        {'type': 'koji_build', 'item': 'nethack-1.2.3-1.f31'},
+        {'type': 'koji_build', 'item': 'nethack-1.2.3-1.f31'},
+    ]
+    with mock.patch('greenwave.resources.ResultsRetriever.prefetch'):
+        response = make_decision(subject=subjects, verbose=True)
+    assert 200 == response.status_code
+    mock_waivers.assert_called_once()
+    filters = mock_waivers.call_args[0][0]
+    assert [f['subject_identifier'] for f in filters] == ['nethack-1.2.3-1.f31']
+
+
 def test_make_decision_with_no_tests_required(mock_results, mock_waivers, make_decision):
     mock_results.return_value = []
     mock_waivers.return_value = []
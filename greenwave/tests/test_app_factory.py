@@ -36,3 +36,10 @@ def test_remote_rules_base_url(mock_load_policies):
     assert app.config['DIST_GIT_URL_TEMPLATE'] == (
         'http://localhost.localdomain/{other_params}/blablabla/gating.yaml'
     )
+
+
+def test_results_executor_max_workers():
+    config = TestingConfig()
+    config.RESULTS_PREFETCH_MAX_WORKERS = 3
+    app = create_app(config)
+    assert app.results_executor._max_workers == 3  # pylint: disable=protected-access
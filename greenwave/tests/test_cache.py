@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: GPL-2.0+
+
+import threading
+import time
+
+from greenwave.cache import cached
+
+
+def test_cached_computes_value_once_for_concurrent_calls(app):
+    # Concurrent calls are coalesced by the per-key mutex of the dogpile
+    # cache region, as long as the backend stores values.
+    app.cache.configure('dogpile.cache.memory', replace_existing_backend=True)
+    calls = []
+
+    @cached
+    def slow_function(arg):
+        calls.append(arg)
+        time.sleep(0.1)
+        return arg * 2
+
+    results = []
+
+    def call():
+        with app.app_context():
+            results.append(slow_function(21))
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 5
+    assert calls == [21]
@@ -5,11 +5,15 @@ import pytest
 import mock
 import time
 
+from collections import OrderedDict
 from textwrap import dedent
 
+import greenwave.policies
+from greenwave import resources as gw_resources
 from greenwave.app_factory import create_app
-from greenwave.decision import Decision
+from greenwave.decision import Decision, _has_remote_rules
 from greenwave.policies import (
+    _load_remote_policies,
     applicable_decision_context_product_version_pairs,
     load_policies,
     summarize_answers,
@@ -19,23 +23,35 @@ from greenwave.policies import (
     RuleSatisfied,
     TestResultMissing,
     TestResultFailed,
-    OnDemandPolicy
+    OnDemandPolicy,
+    PassingTestCaseRule,
 )
 from greenwave.resources import ResultsRetriever, KojiScmUrlParseError
 from greenwave.safe_yaml import SafeYAMLError
 from greenwave.subjects.factory import create_subject
 from greenwave.waivers import waive_answers
-from greenwave.config import TestingConfig, Config
+from greenwave.config import Config, FedoraTestingConfig, TestingConfig
 from greenwave.utils import add_to_timestamp
 
 
 @pytest.fixture(autouse=True)
-def app():
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
+def app_context(module_app):
+    with module_app.app_context():
         yield
 
 
+@pytest.fixture
+def mock_retrieve_scm_from_koji():
+    with mock.patch.object(gw_resources, 'retrieve_scm_from_koji') as mocked:
+        yield mocked
+
+
+@pytest.fixture
+def mock_retrieve_yaml_remote_rule():
+    with mock.patch.object(gw_resources, 'retrieve_yaml_remote_rule') as mocked:
+        yield mocked
+
+
 def answer_types(answers):
     return [x.to_json()['type'] for x in answers]
 
@@ -51,13 +67,15 @@ class DummyResultsRetriever(ResultsRetriever):
         self.outcome = outcome
         self.external_cache = {}
         self.retrieve_data_called = 0
+        self._identifier = subject.identifier if subject else None
+        self._type = subject.type if subject else None
 
     def _retrieve_data(self, params):
         self.retrieve_data_called += 1
-        if (self.subject and (params.get('item') == self.subject.identifier or
-                              params.get('nvr') == self.subject.identifier) and
-                ('type' not in params or self.subject.type in params['type'].split(',')) and
-                (params.get('testcases') is None or params.get('testcases') == self.testcase)):
+        if (self._identifier and self._identifier in (params.get('item'), params.get('nvr')) and
+                ('type' not in params or self._type in params['type'].split(',')) and
+                ('testcases' not in params or
+                 self.testcase in params['testcases'].split(','))):
             return [{
                 'id': 123,
                 'data': {
@@ -97,9 +115,8 @@ def test_summarize_answers():
         'Of 2 required tests, 1 result missing'
 
 
-def test_decision_with_missing_result(tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_decision_with_missing_result(cached_load_policies):
+    policies = cached_load_policies(dedent("""
         --- !Policy
         id: "rawhide_compose_sync_to_mirrors"
         product_versions:
@@ -109,7 +126,6 @@ def test_decision_with_missing_result(tmpdir):
         rules:
           - !PassingTestCaseRule {test_case_name: sometest}
         """))
-    policies = load_policies(tmpdir.strpath)
 
     subject = create_subject('compose', 'some_nevr')
     results = DummyResultsRetriever()
@@ -120,15 +136,14 @@ def test_decision_with_missing_result(tmpdir):
     assert answer_types(decision.answers) == ['test-result-missing']
 
 
-def test_waive_brew_koji_mismatch(tmpdir):
+def test_waive_brew_koji_mismatch(cached_load_policies):
     """ Ensure that a koji_build waiver can match a brew-build result
 
     Note that 'brew-build' in the result does not match 'koji_build' in the
     waiver.  Even though these are different strings, this should work.
     """
 
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+    policies_yaml = dedent("""
         --- !Policy
         id: some_id
         product_versions:
@@ -137,8 +152,8 @@ def test_waive_brew_koji_mismatch(tmpdir):
         subject_type: koji_build
         rules:
           - !PassingTestCaseRule {test_case_name: sometest}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
 
     subject = create_subject('koji_build', 'some_nevr')
     results = DummyResultsRetriever(subject, 'sometest', 'FAILED')
@@ -163,15 +178,14 @@ def test_waive_brew_koji_mismatch(tmpdir):
     assert answer_types(answers) == ['test-result-failed-waived']
 
 
-def test_waive_bodhi_update(tmpdir):
+def test_waive_bodhi_update(cached_load_policies):
     """ Ensure that a koji_build waiver can match a brew-build result
 
     Note that 'brew-build' in the result does not match 'koji_build' in the
     waiver.  Even though these are different strings, this should work.
     """
 
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+    policies_yaml = dedent("""
         --- !Policy
         id: some_id
         product_versions:
@@ -180,8 +194,8 @@ def test_waive_bodhi_update(tmpdir):
         subject_type: bodhi_update
         rules:
           - !PassingTestCaseRule {test_case_name: sometest}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
 
     subject = create_subject('bodhi_update', 'some_bodhi_update')
     results = DummyResultsRetriever(subject, 'sometest', 'FAILED')
@@ -204,17 +218,16 @@ def test_waive_bodhi_update(tmpdir):
     assert answer_types(answers) == ['test-result-failed-waived']
 
 
-def test_load_policies():
-    app = create_app('greenwave.config.TestingConfig')
-    assert len(app.config['policies']) > 0
+def test_load_policies(module_app):
+    assert len(module_app.config['policies']) > 0
     assert any(policy.id == 'taskotron_release_critical_tasks'
-               for policy in app.config['policies'])
+               for policy in module_app.config['policies'])
     assert any(policy.decision_context == 'bodhi_update_push_stable'
-               for policy in app.config['policies'])
+               for policy in module_app.config['policies'])
     assert any(policy.all_decision_contexts == ['bodhi_update_push_stable']
-               for policy in app.config['policies'])
+               for policy in module_app.config['policies'])
     assert any(getattr(rule, 'test_case_name', None) == 'dist.rpmdeplint'
-               for policy in app.config['policies'] for rule in policy.rules)
+               for policy in module_app.config['policies'] for rule in policy.rules)
 
 
 def test_misconfigured_policy_rules(tmpdir):
@@ -238,9 +251,8 @@ def test_misconfigured_policy_rules(tmpdir):
         load_policies(tmpdir.strpath)
 
 
-def test_passing_testcasename_with_scenario(tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_passing_testcasename_with_scenario(cached_load_policies):
+    policies_yaml = dedent("""
         --- !Policy
         id: "rawhide_compose_sync_to_mirrors"
         product_versions:
@@ -250,8 +262,8 @@ def test_passing_testcasename_with_scenario(tmpdir):
         rules:
           - !PassingTestCaseRule {test_case_name: compose.install_default_upload,
           scenario: somescenario}
-        """))
-    load_policies(tmpdir.strpath)
+        """)
+    cached_load_policies(policies_yaml)
 
 
 @pytest.mark.parametrize(('product_version', 'applies'), [
@@ -259,9 +271,8 @@ def test_passing_testcasename_with_scenario(tmpdir):
     ('fedora-28', True),
     ('epel-7', False),
 ])
-def test_product_versions_pattern(product_version, applies, tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_product_versions_pattern(product_version, applies, cached_load_policies):
+    policies_yaml = dedent("""
         --- !Policy
         id: dummy_policy
         product_versions:
@@ -270,8 +281,8 @@ def test_product_versions_pattern(product_version, applies, tmpdir):
         subject_type: bodhi_update
         rules:
           - !PassingTestCaseRule {test_case_name: test}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
     policy = policies[0]
 
     assert applies == policy.matches(
@@ -280,83 +291,108 @@ def test_product_versions_pattern(product_version, applies, tmpdir):
         subject_type='bodhi_update')
 
 
-@pytest.mark.parametrize('namespace', ["rpms", ""])
-def test_remote_rule_policy(tmpdir, namespace):
+@pytest.mark.parametrize((
+    'subject_type', 'subject_identifier', 'namespace', 'pkg_name', 'product_version',
+    'decision_context', 'test_case_name', 'expected_url'), (
+    (
+        'koji_build', 'nethack-1.2.3-1.el9000', 'rpms', 'nethack',
+        'fedora-26', 'bodhi_update_push_stable_with_remoterule', 'dist.upgradepath',
+        'https://src.fedoraproject.org/rpms/nethack/raw/'
+        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml',
+    ),
+    (
+        'koji_build', 'nethack-1.2.3-1.el9000', '', 'nethack',
+        'fedora-26', 'bodhi_update_push_stable_with_remoterule', 'dist.upgradepath',
+        'https://src.fedoraproject.org/nethack/raw/'
+        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml',
+    ),
+    (
+        'brew-build-group',
+        'sha256:0f41e56a1c32519e189ddbcb01d2551e861bd74e603d01769ef5f70d4b30a2dd',
+        None, None,
+        'fedora-26', 'bodhi_update_push_stable_with_remoterule', 'dist.upgradepath',
+        'https://git.example.com/devops/greenwave-policies/side-tags/raw/'
+        'master/0f41e56a1c32519e189ddbcb01d2551e861bd74e603d01769ef5f70d4b30a2dd.yaml',
+    ),
+    (
+        'redhat-module', '389-ds-1.4-820181127205924.9edba152', 'modules', '389-ds',
+        'rhel-8', 'osci_compose_gate', 'baseos-ci.redhat-module.tier0.functional',
+        'https://src.fedoraproject.org/modules/389-ds/raw/'
+        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml',
+    ),
+    (
+        'redhat-module', '389-ds-1.4-820181127205924.9edba152', '', '389-ds',
+        'rhel-8', 'osci_compose_gate', 'baseos-ci.redhat-module.tier0.functional',
+        'https://src.fedoraproject.org/389-ds/raw/'
+        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml',
+    ),
+    (
+        'redhat-container-image', '389-ds-1.4-820181127205924.9edba152', 'containers', '389-ds',
+        'rhel-8', 'osci_compose_gate', 'baseos-ci.redhat-container-image.tier0.functional',
+        'https://src.fedoraproject.org/containers/389-ds/raw/'
+        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml',
+    ),
+))
+def test_remote_rule_policy(
+        cached_load_policies, subject_type, subject_identifier, namespace, pkg_name,
+        product_version, decision_context, test_case_name, expected_url,
+        mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction.
     In this case we are just mocking koji """
 
-    subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
+    subject = create_subject(subject_type, subject_identifier)
 
-    serverside_fragment = dedent("""
+    serverside_fragment = dedent(f"""
         --- !Policy
         id: "taskotron_release_critical_tasks_with_remoterule"
         product_versions:
-          - fedora-26
-        decision_context: bodhi_update_push_stable_with_remoterule
-        subject_type: koji_build
+          - {product_version}
+        decision_context: {decision_context}
+        subject_type: {subject_type}
         rules:
-          - !RemoteRule {}
+          - !RemoteRule {{}}
         """)
 
-    remote_fragment = dedent("""
+    remote_fragment = dedent(f"""
         --- !Policy
         id: "some-policy-from-a-random-packager"
         product_versions:
-          - fedora-26
-        decision_context: bodhi_update_push_stable_with_remoterule
+          - {product_version}
+        decision_context: {decision_context}
+        subject_type: {subject_type}
         rules:
-        - !PassingTestCaseRule {test_case_name: dist.upgradepath}
+        - !PassingTestCaseRule {{test_case_name: {test_case_name}}}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = (namespace, 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever()
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
-            f.assert_called_with(
-                'https://src.fedoraproject.org/{0}'.format(
-                    '' if not namespace else namespace + '/'
-                ) + 'nethack/raw/c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml'
-            )
-
-
-def test_remote_rule_policy_old_config(tmpdir):
-    """ Testing the RemoteRule with the koji interaction.
-    In this case we are just mocking koji """
+    mock_retrieve_scm_from_koji.return_value = (
+        namespace, pkg_name, 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    policies = cached_load_policies(serverside_fragment)
 
-    subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
+    # Ensure that presence of a result is success.
+    results = DummyResultsRetriever(subject, test_case_name)
+    decision = Decision(decision_context, product_version)
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
 
-    serverside_fragment = dedent("""
-        --- !Policy
-        id: "taskotron_release_critical_tasks_with_remoterule"
-        product_versions:
-          - fedora-26
-        decision_context: bodhi_update_push_stable_with_remoterule
-        subject_type: koji_build
-        rules:
-          - !RemoteRule {}
-        """)
+    # Ensure that absence of a result is failure.
+    results = DummyResultsRetriever(subject)
+    decision = Decision(decision_context, product_version)
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
+
+    # And that a result with a failure, is a failure.
+    results = DummyResultsRetriever(subject, test_case_name, 'FAILED')
+    decision = Decision(decision_context, product_version)
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
+    mock_retrieve_yaml_remote_rule.assert_called_with(expected_url)
+
+    if namespace is None:
+        mock_retrieve_scm_from_koji.assert_not_called()
 
+
+def test_remote_policies_parsed_once_per_url_and_content(monkeypatch):
     remote_fragment = dedent("""
         --- !Policy
         id: "some-policy-from-a-random-packager"
@@ -366,55 +402,65 @@ def test_remote_rule_policy_old_config(tmpdir):
         rules:
         - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
-
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-
-    config_remote_rules_backup = Config.REMOTE_RULE_POLICIES
-
-    try:
-        delattr(Config, 'REMOTE_RULE_POLICIES')
-
-        config = TestingConfig()
-        config.DIST_GIT_BASE_URL = 'http://localhost.localdomain/'
-        config.DIST_GIT_URL_TEMPLATE = '{DIST_GIT_BASE_URL}{pkg_name}/{rev}/gating.yaml'
-
-        app = create_app(config)
-
-        with app.app_context():
-            with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-                scm.return_value = (
-                    'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb'
-                )
-                with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-                    f.return_value = remote_fragment
-                    policies = load_policies(tmpdir.strpath)
-
-                    # Ensure that presence of a result is success.
-                    results = DummyResultsRetriever(subject, 'dist.upgradepath')
-                    decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-                    decision.check(subject, policies, results)
-                    assert answer_types(decision.answers) == [
-                        'fetched-gating-yaml', 'test-result-passed']
-
-                    call = mock.call(
-                        'http://localhost.localdomain/nethack/'
-                        'c3c47a08a66451cb9686c49f040776ed35a0d1bb/gating.yaml'
-                    )
-                    assert f.mock_calls == [call]
-    finally:
-        Config.REMOTE_RULE_POLICIES = config_remote_rules_backup
-
-
-def test_remote_rule_policy_brew_build_group(tmpdir):
+    url1 = 'https://src.example.com/rpms/nethack/raw/c3c47a0/f/gating.yaml'
+    url2 = 'https://src.example.com/rpms/nethack/raw/4f2e2ab/f/gating.yaml'
+
+    monkeypatch.setattr(greenwave.policies, '_remote_policies_cache', OrderedDict())
+    monkeypatch.setattr(greenwave.policies, '_REMOTE_POLICIES_CACHE_SIZE', 2)
+    with mock.patch.object(
+            RemotePolicy, 'safe_load_all', wraps=RemotePolicy.safe_load_all) as parse:
+        policies1 = _load_remote_policies(url1, remote_fragment)
+        assert _load_remote_policies(url1, remote_fragment.encode()) is policies1
+        policies2 = _load_remote_policies(url2, remote_fragment)
+        assert parse.call_count == 2
+
+        # Least recently used file is dropped.
+        _load_remote_policies(url1, remote_fragment + '\n')
+        assert parse.call_count == 3
+        assert _load_remote_policies(url1, remote_fragment) is not policies1
+        assert parse.call_count == 4
+
+    assert [policy.source for policy in policies1] == [url1]
+    assert [policy.source for policy in policies2] == [url2]
+
+
+def test_has_remote_rules_only_for_applicable_policies(cached_load_policies):
+    policies = cached_load_policies(dedent("""
+        --- !Policy
+        id: "remote"
+        product_versions: [fedora-*]
+        decision_context: bodhi_update_push_stable
+        subject_type: koji_build
+        rules:
+          - !RemoteRule {}
+        --- !Policy
+        id: "local"
+        product_versions: [fedora-*]
+        decision_context: bodhi_update_push_testing
+        subject_type: koji_build
+        rules:
+          - !PassingTestCaseRule {test_case_name: dist.rpmdeplint}
+        """))
+    subjects = [create_subject('koji_build', 'nethack-1.2.3-1.fc31')]
+
+    assert _has_remote_rules(
+        policies, ['bodhi_update_push_stable'], 'fedora-31', subjects)
+    assert not _has_remote_rules(
+        policies, ['bodhi_update_push_testing'], 'fedora-31', subjects)
+    assert not _has_remote_rules(
+        policies, ['bodhi_update_push_stable'], 'rhel-8', subjects)
+    assert not _has_remote_rules(
+        policies, ['bodhi_update_push_stable'], 'fedora-31',
+        [create_subject('bodhi_update', 'FEDORA-2000-abcdef01')])
+
+
+def test_remote_rule_policy_old_config(
+        cached_load_policies, monkeypatch,
+        mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction.
     In this case we are just mocking koji """
 
-    subject = create_subject(
-        'brew-build-group',
-        'sha256:0f41e56a1c32519e189ddbcb01d2551e861bd74e603d01769ef5f70d4b30a2dd'
-    )
-    namespace = 'rpms'
+    subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
 
     serverside_fragment = dedent("""
         --- !Policy
@@ -422,7 +468,7 @@ def test_remote_rule_policy_brew_build_group(tmpdir):
         product_versions:
           - fedora-26
         decision_context: bodhi_update_push_stable_with_remoterule
-        subject_type: brew-build-group
+        subject_type: koji_build
         rules:
           - !RemoteRule {}
         """)
@@ -432,45 +478,42 @@ def test_remote_rule_policy_brew_build_group(tmpdir):
         id: "some-policy-from-a-random-packager"
         product_versions:
           - fedora-26
-        subject_type: brew-build-group
         decision_context: bodhi_update_push_stable_with_remoterule
         rules:
         - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = (namespace, 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever()
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
-            f.assert_called_with(
-                'https://git.example.com/devops/greenwave-policies/side-tags/raw/'
-                'master/0f41e56a1c32519e189ddbcb01d2551e861bd74e603d01769ef5f70d4b30a2dd.yaml'
-            )
-        scm.assert_not_called()
-
-
-def test_remote_rule_policy_with_no_remote_rule_policies_param_defined(tmpdir):
+    monkeypatch.delattr(Config, 'REMOTE_RULE_POLICIES')
+
+    config = TestingConfig()
+    config.DIST_GIT_BASE_URL = 'http://localhost.localdomain/'
+    config.DIST_GIT_URL_TEMPLATE = '{DIST_GIT_BASE_URL}{pkg_name}/{rev}/gating.yaml'
+
+    app = create_app(config)
+
+    with app.app_context():
+        mock_retrieve_scm_from_koji.return_value = (
+            'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb'
+        )
+        mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+        policies = cached_load_policies(serverside_fragment)
+
+        # Ensure that presence of a result is success.
+        results = DummyResultsRetriever(subject, 'dist.upgradepath')
+        decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
+        decision.check(subject, policies, results)
+        assert answer_types(decision.answers) == [
+            'fetched-gating-yaml', 'test-result-passed']
+
+        call = mock.call(
+            'http://localhost.localdomain/nethack/'
+            'c3c47a08a66451cb9686c49f040776ed35a0d1bb/gating.yaml'
+        )
+        assert mock_retrieve_yaml_remote_rule.mock_calls == [call]
+
+
+def test_remote_rule_policy_with_no_remote_rule_policies_param_defined(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction.
     But this time let's assume that REMOTE_RULE_POLICIES is not defined. """
 
@@ -497,146 +540,28 @@ def test_remote_rule_policy_with_no_remote_rule_policies_param_defined(tmpdir):
         - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    app = create_app('greenwave.config.FedoraTestingConfig')
+    app = create_app(FedoraTestingConfig)
 
     with app.app_context():
-        with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-            scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-            with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-                f.return_value = remote_fragment
-                policies = load_policies(tmpdir.strpath)
-
-                # Ensure that presence of a result is success.
-                results = DummyResultsRetriever(subject, 'dist.upgradepath')
-                decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-                decision.check(subject, policies, results)
-                assert answer_types(decision.answers) == [
-                    'fetched-gating-yaml', 'test-result-passed']
-                f.assert_called_with(
-                    'https://src.fedoraproject.org/rpms/nethack/raw/'
-                    'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml'
-                )
-
-
-@pytest.mark.parametrize('namespace', ["modules", ""])
-def test_remote_rule_policy_redhat_module(tmpdir, namespace):
-    """ Testing the RemoteRule with the koji interaction.
-    In this case we are just mocking koji """
-
-    nvr = '389-ds-1.4-820181127205924.9edba152'
-    subject = create_subject('redhat-module', nvr)
-
-    serverside_fragment = dedent("""
-        --- !Policy
-        id: "taskotron_release_critical_tasks_with_remoterule"
-        product_versions:
-          - rhel-8
-        decision_context: osci_compose_gate
-        subject_type: redhat-module
-        rules:
-          - !RemoteRule {}
-        """)
-
-    remote_fragment = dedent("""
-        --- !Policy
-        product_versions:
-          - rhel-8
-        decision_context: osci_compose_gate
-        subject_type: redhat-module
-        rules:
-          - !PassingTestCaseRule {test_case_name: baseos-ci.redhat-module.tier0.functional}
-
-        """)
-
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = (namespace, '389-ds', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(subject, 'baseos-ci.redhat-module.tier0.functional')
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever(subject)
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(
-                subject, 'baseos-ci.redhat-module.tier0.functional', 'FAILED')
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
-
-
-def test_remote_rule_policy_redhat_container_image(tmpdir):
-    """ Testing the RemoteRule with the koji interaction.
-    In this case we are just mocking koji """
-
-    nvr = '389-ds-1.4-820181127205924.9edba152'
-    subject = create_subject('redhat-container-image', nvr)
-
-    serverside_fragment = dedent("""
-        --- !Policy
-        id: "taskotron_release_critical_tasks_with_remoterule"
-        product_versions:
-          - rhel-8
-        decision_context: osci_compose_gate
-        subject_type: redhat-container-image
-        rules:
-          - !RemoteRule {}
-        """)
-
-    remote_fragment = dedent("""
-        --- !Policy
-        product_versions:
-          - rhel-8
-        decision_context: osci_compose_gate
-        subject_type: redhat-container-image
-        rules:
-          - !PassingTestCaseRule {test_case_name: baseos-ci.redhat-container-image.tier0.functional}
+        mock_retrieve_scm_from_koji.return_value = (
+            'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+        mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+        policies = cached_load_policies(serverside_fragment)
+
+        # Ensure that presence of a result is success.
+        results = DummyResultsRetriever(subject, 'dist.upgradepath')
+        decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
+        decision.check(subject, policies, results)
+        assert answer_types(decision.answers) == [
+            'fetched-gating-yaml', 'test-result-passed']
+        mock_retrieve_yaml_remote_rule.assert_called_with(
+            'https://src.fedoraproject.org/rpms/nethack/raw/'
+            'c3c47a08a66451cb9686c49f040776ed35a0d1bb/f/gating.yaml'
+        )
 
-        """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('containers', '389-ds', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(
-                subject, 'baseos-ci.redhat-container-image.tier0.functional')
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever(subject)
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(
-                subject, 'baseos-ci.redhat-container-image.tier0.functional', 'FAILED')
-            decision = Decision('osci_compose_gate', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
-
-
-def test_remote_rule_with_multiple_contexts(tmpdir):
+def test_remote_rule_with_multiple_contexts(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction.
     In this case we are just mocking koji """
 
@@ -675,21 +600,18 @@ def test_remote_rule_with_multiple_contexts(tmpdir):
 
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('containers', '389-ds', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-            results = DummyResultsRetriever(
-                subject, 'baseos-ci.redhat-container-image.tier0.functional')
-            decision = Decision('osci_compose_gate1', 'rhel-8')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-
-def test_get_sub_policies_multiple_urls(tmpdir, requests_mock):
+    mock_retrieve_scm_from_koji.return_value = (
+        'containers', '389-ds', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    policies = cached_load_policies(serverside_fragment)
+    results = DummyResultsRetriever(
+        subject, 'baseos-ci.redhat-container-image.tier0.functional')
+    decision = Decision('osci_compose_gate1', 'rhel-8')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
+
+
+def test_get_sub_policies_multiple_urls(requests_mock, mock_retrieve_scm_from_koji):
     """ Testing the RemoteRule with the koji interaction when on_demand policy is given.
     In this case we are just mocking koji """
 
@@ -717,30 +639,31 @@ def test_get_sub_policies_multiple_urls(tmpdir, requests_mock):
     }
 
     with app.app_context():
-        with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-            scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-            urls = [
-                'https://src{0}.fp.org/{1}/{2}/raw/{3}/f/gating.yaml'.format(i, *scm.return_value)
-                for i in range(1, 3)
-            ]
-            for url in urls:
-                requests_mock.get(url, status_code=404)
-
-            policy = OnDemandPolicy.create_from_json(serverside_json)
-            assert isinstance(policy.rules[0], RemoteRule)
-            assert policy.rules[0].required
-
-            results = DummyResultsRetriever()
-            decision = Decision(None, 'fedora-26')
-            decision.check(subject, [policy], results)
-            request_history = [(r.method, r.url) for r in requests_mock.request_history]
-            assert request_history == [('GET', urls[0]), ('GET', urls[1])]
-            assert answer_types(decision.answers) == ['missing-gating-yaml']
-            assert not decision.answers[0].is_satisfied
-            assert decision.answers[0].subject.identifier == subject.identifier
-
-
-def test_get_sub_policies_scm_error(tmpdir):
+        mock_retrieve_scm_from_koji.return_value = (
+            'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+        urls = [
+            'https://src{0}.fp.org/{1}/{2}/raw/{3}/f/gating.yaml'.format(
+                i, *mock_retrieve_scm_from_koji.return_value)
+            for i in range(1, 3)
+        ]
+        for url in urls:
+            requests_mock.get(url, status_code=404)
+
+        policy = OnDemandPolicy.create_from_json(serverside_json)
+        assert isinstance(policy.rules[0], RemoteRule)
+        assert policy.rules[0].required
+
+        results = DummyResultsRetriever()
+        decision = Decision(None, 'fedora-26')
+        decision.check(subject, [policy], results)
+        request_history = [(r.method, r.url) for r in requests_mock.request_history]
+        assert request_history == [('GET', urls[0]), ('GET', urls[1])]
+        assert answer_types(decision.answers) == ['missing-gating-yaml']
+        assert not decision.answers[0].is_satisfied
+        assert decision.answers[0].subject.identifier == subject.identifier
+
+
+def test_get_sub_policies_scm_error(cached_load_policies, mock_retrieve_scm_from_koji):
     """
     Test that _get_sub_policies correctly returns an error to go in
     the response - but doesn't raise an exception - when SCM URL parse
@@ -763,18 +686,15 @@ def test_get_sub_policies_scm_error(tmpdir):
           - !RemoteRule {}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.side_effect = KojiScmUrlParseError("Failed to parse SCM URL")
-        policies = load_policies(tmpdir.strpath)
-        results = DummyResultsRetriever(
-            subject, 'baseos-ci.redhat-container-image.tier0.functional')
-        decision = Decision('osci_compose_gate1', 'rhel-8')
-        decision.check(subject, policies, results)
-        assert answer_types(decision.answers) == ['failed-fetch-gating-yaml']
-        assert not decision.answers[0].is_satisfied
-        assert decision.answers[0].subject.identifier == subject.identifier
+    mock_retrieve_scm_from_koji.side_effect = KojiScmUrlParseError("Failed to parse SCM URL")
+    policies = cached_load_policies(serverside_fragment)
+    results = DummyResultsRetriever(
+        subject, 'baseos-ci.redhat-container-image.tier0.functional')
+    decision = Decision('osci_compose_gate1', 'rhel-8')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['failed-fetch-gating-yaml']
+    assert not decision.answers[0].is_satisfied
+    assert decision.answers[0].subject.identifier == subject.identifier
 
 
 def test_redhat_container_image_subject_type():
@@ -785,7 +705,7 @@ def test_redhat_container_image_subject_type():
     rh_img_subject = create_subject('redhat-container-image', nvr)
     retriever = ResultsRetriever(ignore_ids=list(), when=cur_time, url=rdb_url)
     with mock.patch('requests.Session.get') as req_get:
-        req_get.json.return_value = {'data': {'item': [nvr]}}
+        req_get.return_value.json.return_value = {'data': []}
         retriever._retrieve_all(rh_img_subject, testcase_name)  # pylint: disable=W0212
         assert req_get.call_count == 2
         assert req_get.call_args_list[0] == mock.call(
@@ -806,7 +726,48 @@ def test_redhat_container_image_subject_type():
         )
 
 
-def test_remote_rule_policy_optional_id(tmpdir):
+def test_results_retriever_shares_identical_queries():
+    nvr = 'nethack-1.2.3-1.el9000'
+    subject = create_subject('koji_build', nvr)
+    retriever = ResultsRetriever(ignore_ids=list(), when=None, url='http://results.db')
+    with mock.patch('requests.Session.get') as req_get:
+        req_get.return_value.json.return_value = {'data': []}
+        retriever._retrieve_all(subject, 'testcase1')  # pylint: disable=W0212
+        retriever._retrieve_all(subject, 'testcase1')  # pylint: disable=W0212
+        assert req_get.call_count == 2
+        retriever._retrieve_all(subject, 'testcase2')  # pylint: disable=W0212
+        assert req_get.call_count == 4
+
+
+def test_results_retriever_skips_duplicate_results():
+    nvr = 'nethack-1.2.3-1.el9000'
+    subject = create_subject('koji_build', nvr)
+    retriever = ResultsRetriever(ignore_ids=list(), when=None, url='http://results.db')
+    with mock.patch('requests.Session.get') as req_get:
+        req_get.return_value.json.return_value = {
+            'data': [{'id': 1, 'outcome': 'PASSED'}]}
+        results = retriever._retrieve_all(subject)  # pylint: disable=W0212
+        assert req_get.call_count == 2
+        assert results == [{'id': 1, 'outcome': 'PASSED'}]
+
+
+def test_results_retriever_prefetch():
+    subjects = [
+        create_subject('koji_build', 'nethack-1.2.3-1.el9000'),
+        create_subject('koji_build', 'nethack-1.2.3-2.el9000'),
+    ]
+    retriever = ResultsRetriever(ignore_ids=list(), when=None, url='http://results.db')
+    with mock.patch('requests.Session.get') as req_get:
+        req_get.return_value.json.return_value = {'data': []}
+        retriever.prefetch(subjects)
+        assert req_get.call_count == 4
+        for subject in subjects:
+            retriever._retrieve_all(subject)  # pylint: disable=W0212
+        assert req_get.call_count == 4
+
+
+def test_remote_rule_policy_optional_id(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
 
     serverside_fragment = dedent("""
@@ -827,22 +788,20 @@ def test_remote_rule_policy_optional_id(tmpdir):
           - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
+    mock_retrieve_scm_from_koji.return_value = (
+        'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    policies = cached_load_policies(serverside_fragment)
 
-            results = DummyResultsRetriever()
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-            assert decision.answers[1].is_satisfied is False
+    results = DummyResultsRetriever()
+    decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
+    assert decision.answers[1].is_satisfied is False
 
 
-def test_remote_rule_malformed_yaml(tmpdir):
+def test_remote_rule_malformed_yaml(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with a malformed gating.yaml file """
 
     subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
@@ -878,24 +837,22 @@ def test_remote_rule_malformed_yaml(tmpdir):
         """)]
 
     for remote_fragment in remote_fragments:
-        p = tmpdir.join('gating.yaml')
-        p.write(serverside_fragment)
-        with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-            scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-            with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-                f.return_value = remote_fragment
-                policies = load_policies(tmpdir.strpath)
-
-                results = DummyResultsRetriever()
-                decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-                decision.check(subject, policies, results)
-                assert answer_types(decision.answers) == [
-                    'fetched-gating-yaml', 'invalid-gating-yaml']
-                assert decision.answers[0].is_satisfied is True
-                assert decision.answers[1].is_satisfied is False
-
-
-def test_remote_rule_malformed_yaml_with_waiver(tmpdir):
+        mock_retrieve_scm_from_koji.return_value = (
+            'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+        mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+        policies = cached_load_policies(serverside_fragment)
+
+        results = DummyResultsRetriever()
+        decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
+        decision.check(subject, policies, results)
+        assert answer_types(decision.answers) == [
+            'fetched-gating-yaml', 'invalid-gating-yaml']
+        assert decision.answers[0].is_satisfied is True
+        assert decision.answers[1].is_satisfied is False
+
+
+def test_remote_rule_malformed_yaml_with_waiver(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with a malformed gating.yaml file
     But this time waiving the error """
 
@@ -932,94 +889,114 @@ def test_remote_rule_malformed_yaml_with_waiver(tmpdir):
         """)]
 
     for remote_fragment in remote_fragments:
-        p = tmpdir.join('gating.yaml')
-        p.write(serverside_fragment)
-        with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-            scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-            with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-                f.return_value = remote_fragment
-                policies = load_policies(tmpdir.strpath)
-
-                results = DummyResultsRetriever()
-                waivers = [{
-                    'id': 1,
-                    'subject_type': 'koji_build',
-                    'subject_identifier': 'nethack-1.2.3-1.el9000',
-                    'subject': {'type': 'koji_build', 'item': 'nethack-1.2.3-1.el9000'},
-                    'testcase': 'invalid-gating-yaml',
-                    'product_version': 'fedora-26',
-                    'comment': 'Waiving the invalid gating.yaml file',
-                    'waived': True,
-                }]
-
-                decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
-                decision.check(subject, policies, results)
-                answers = decision.answers
-                assert answer_types(answers) == ['fetched-gating-yaml', 'invalid-gating-yaml']
-                answers = waive_answers(answers, waivers)
-                assert answer_types(answers) == ['fetched-gating-yaml']
-
-
-def test_remote_rule_required():
+        mock_retrieve_scm_from_koji.return_value = (
+            'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+        mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+        policies = cached_load_policies(serverside_fragment)
+
+        results = DummyResultsRetriever()
+        waivers = [{
+            'id': 1,
+            'subject_type': 'koji_build',
+            'subject_identifier': 'nethack-1.2.3-1.el9000',
+            'subject': {'type': 'koji_build', 'item': 'nethack-1.2.3-1.el9000'},
+            'testcase': 'invalid-gating-yaml',
+            'product_version': 'fedora-26',
+            'comment': 'Waiving the invalid gating.yaml file',
+            'waived': True,
+        }]
+
+        decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-26')
+        decision.check(subject, policies, results)
+        answers = decision.answers
+        assert answer_types(answers) == ['fetched-gating-yaml', 'invalid-gating-yaml']
+        answers = waive_answers(answers, waivers)
+        assert answer_types(answers) == ['fetched-gating-yaml']
+
+
+def test_remote_rule_required(mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with required flag set """
     subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = None
-            policies = Policy.safe_load_all(dedent("""
-                --- !Policy
-                id: test
-                product_versions: [fedora-rawhide]
-                decision_context: test
-                subject_type: koji_build
-                rules:
-                  - !RemoteRule {required: true}
-            """))
-            results = DummyResultsRetriever()
-            decision = Decision('test', 'fedora-rawhide')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['missing-gating-yaml']
-            assert not decision.answers[0].is_satisfied
-            assert decision.answers[0].subject.identifier == subject.identifier
-
-
-def test_parse_policies_unexpected_type():
-    policies = dedent("""
+    mock_retrieve_scm_from_koji.return_value = (
+        'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = None
+    policies = Policy.safe_load_all(dedent("""
         --- !Policy
-        42
-    """)
-    expected_error = "Expected mapping for !Policy tagged object"
-    with pytest.raises(SafeYAMLError, match=expected_error):
-        RemotePolicy.safe_load_all(policies)
-
-
-def test_parse_policies_missing_id():
-    expected_error = "Policy 'untitled': Attribute 'id' is required"
-    with pytest.raises(SafeYAMLError, match=expected_error):
-        Policy.safe_load_all(dedent("""
-            --- !Policy
-            product_versions: [fedora-rawhide]
-            decision_context: test
-            subject_type: compose
-            excluded_packages: []
-            rules:
-              - !PassingTestCaseRule {test_case_name: compose.cloud.all}
-        """))
+        id: test
+        product_versions: [fedora-rawhide]
+        decision_context: test
+        subject_type: koji_build
+        rules:
+          - !RemoteRule {required: true}
+    """))
+    results = DummyResultsRetriever()
+    decision = Decision('test', 'fedora-rawhide')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['missing-gating-yaml']
+    assert not decision.answers[0].is_satisfied
+    assert decision.answers[0].subject.identifier == subject.identifier
 
 
-def test_parse_policies_missing_product_versions():
-    expected_error = "Policy 'test': Attribute 'product_versions' is required"
+@pytest.mark.parametrize(('policy_class', 'policies_yaml', 'expected_error'), (
+    pytest.param(RemotePolicy, """
+        --- !Policy
+        42
+    """, "Expected mapping for !Policy tagged object", id='unexpected-type'),
+    pytest.param(Policy, """
+        --- !Policy
+        product_versions: [fedora-rawhide]
+        decision_context: test
+        subject_type: compose
+        excluded_packages: []
+        rules:
+          - !PassingTestCaseRule {test_case_name: compose.cloud.all}
+    """, "Policy 'untitled': Attribute 'id' is required", id='missing-id'),
+    pytest.param(Policy, """
+        --- !Policy
+        id: test
+        decision_context: test
+        subject_type: compose
+        excluded_packages: []
+        rules:
+          - !PassingTestCaseRule {test_case_name: compose.cloud.all}
+    """, "Policy 'test': Attribute 'product_versions' is required", id='missing-product-versions'),
+    pytest.param(Policy, """
+        --- !Policy
+        id: test
+        product_versions: [fedora-rawhide]
+        decision_context: test
+        subject_type: compose
+        excluded_packages: []
+        rules:
+          - !PassingTestCaseRule {test_case_name: compose.cloud.all}
+          - bad_rule
+    """, "Policy 'test': Attribute 'rules': Expected list of Rule objects", id='invalid-rule'),
+    pytest.param(RemotePolicy, """
+        --- !Policy
+        id: test
+        product_versions: [fedora-rawhide]
+        decision_context: bodhi_update_push_stable_with_remoterule
+        subject_type: koji_build
+        rules:
+          - !RemoteRule {}
+    """, "Policy 'test': RemoteRule is not allowed in remote policies", id='remote-recursive'),
+    pytest.param(RemotePolicy, """
+        --- !Policy
+        id: test
+        product_versions: [fedora-rawhide]
+        decision_context: test
+        rules:
+          - !PassingTestCaseRule {test_case: test.case.name}
+    """, (
+        "Policy 'test': "
+        "Attribute 'rules': "
+        "YAML object !PassingTestCaseRule: "
+        "Attribute 'test_case_name' is required"
+    ), id='remote-missing-rule-attribute'),
+))
+def test_parse_policies_errors(policy_class, policies_yaml, expected_error):
     with pytest.raises(SafeYAMLError, match=expected_error):
-        Policy.safe_load_all(dedent("""
-            --- !Policy
-            id: test
-            decision_context: test
-            subject_type: compose
-            excluded_packages: []
-            rules:
-              - !PassingTestCaseRule {test_case_name: compose.cloud.all}
-        """))
+        policy_class.safe_load_all(dedent(policies_yaml))
 
 
 @pytest.mark.parametrize('policy_class', [Policy, RemotePolicy])
@@ -1056,9 +1033,8 @@ def test_parse_policies_both_decision_contexts_set(policy_class):
         """))
 
 
-def test_policy_with_arbitrary_subject_type(tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_policy_with_arbitrary_subject_type(cached_load_policies):
+    policies_yaml = dedent("""
         --- !Policy
         id: "some_policy"
         product_versions:
@@ -1067,8 +1043,8 @@ def test_policy_with_arbitrary_subject_type(tmpdir):
         subject_type: kind-of-magic
         rules:
           - !PassingTestCaseRule {test_case_name: sometest}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
     subject = create_subject('kind-of-magic', 'nethack-1.2.3-1.el9000')
     results = DummyResultsRetriever(subject, 'sometest', 'PASSED')
     decision = Decision('bodhi_update_push_stable', 'rhel-9000')
@@ -1076,9 +1052,8 @@ def test_policy_with_arbitrary_subject_type(tmpdir):
     assert answer_types(decision.answers) == ['test-result-passed']
 
 
-def test_policy_all_decision_contexts(tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_policy_all_decision_contexts(cached_load_policies):
+    policies_yaml = dedent("""
         --- !Policy
         id: "some_policy1"
         product_versions:
@@ -1099,8 +1074,8 @@ def test_policy_all_decision_contexts(tmpdir):
         subject_type: kind-of-magic
         rules:
           - !PassingTestCaseRule {test_case_name: sometest}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
     policy = policies[0]
     assert len(policy.all_decision_contexts) == 3
     assert set(policy.all_decision_contexts) == {'test1', 'test2', 'test3'}
@@ -1109,9 +1084,8 @@ def test_policy_all_decision_contexts(tmpdir):
     assert policy.all_decision_contexts == ['test4']
 
 
-def test_decision_multiple_contexts(tmpdir):
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+def test_decision_multiple_contexts(cached_load_policies):
+    policies_yaml = dedent("""
         --- !Policy
         id: "some_policy"
         product_versions:
@@ -1129,8 +1103,8 @@ def test_decision_multiple_contexts(tmpdir):
         subject_type: kind-of-magic
         rules:
           - !PassingTestCaseRule {test_case_name: someothertest}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
     subject = create_subject('kind-of-magic', 'nethack-1.2.3-1.el9000')
     results = DummyResultsRetriever(subject, 'sometest', 'PASSED')
     decision = Decision(['bodhi_update_push_stable', 'some_other_context'], 'rhel-9000')
@@ -1143,9 +1117,8 @@ def test_decision_multiple_contexts(tmpdir):
     ('net*', ['test-result-passed']),
     ('python-requests', []),
 ])
-def test_policy_with_packages_allowlist(tmpdir, package, expected_answers):
-    p = tmpdir.join('temp.yaml')
-    p.write(dedent("""
+def test_policy_with_packages_allowlist(cached_load_policies, package, expected_answers):
+    policies_yaml = dedent("""
         --- !Policy
         id: "some_policy"
         product_versions:
@@ -1156,8 +1129,8 @@ def test_policy_with_packages_allowlist(tmpdir, package, expected_answers):
         - {}
         rules:
           - !PassingTestCaseRule {{test_case_name: sometest}}
-        """.format(package)))
-    policies = load_policies(tmpdir.strpath)
+        """.format(package))
+    policies = cached_load_policies(policies_yaml)
     subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
     results = DummyResultsRetriever(subject, 'sometest', 'PASSED')
     decision = Decision('test', 'rhel-9000')
@@ -1165,22 +1138,6 @@ def test_policy_with_packages_allowlist(tmpdir, package, expected_answers):
     assert answer_types(decision.answers) == expected_answers
 
 
-def test_parse_policies_invalid_rule():
-    expected_error = "Policy 'test': Attribute 'rules': Expected list of Rule objects"
-    with pytest.raises(SafeYAMLError, match=expected_error):
-        Policy.safe_load_all(dedent("""
-            --- !Policy
-            id: test
-            product_versions: [fedora-rawhide]
-            decision_context: test
-            subject_type: compose
-            excluded_packages: []
-            rules:
-              - !PassingTestCaseRule {test_case_name: compose.cloud.all}
-              - bad_rule
-        """))
-
-
 def test_parse_policies_remote_missing_id_is_ok():
     policies = RemotePolicy.safe_load_all(dedent("""
         --- !Policy
@@ -1219,20 +1176,6 @@ def test_parse_policies_remote_missing_subject_type_is_ok():
     assert policies[0].subject_type == 'koji_build'
 
 
-def test_parse_policies_remote_recursive():
-    expected_error = "Policy 'test': RemoteRule is not allowed in remote policies"
-    with pytest.raises(SafeYAMLError, match=expected_error):
-        RemotePolicy.safe_load_all(dedent("""
-            --- !Policy
-            id: test
-            product_versions: [fedora-rawhide]
-            decision_context: bodhi_update_push_stable_with_remoterule
-            subject_type: koji_build
-            rules:
-              - !RemoteRule {}
-        """))
-
-
 def test_parse_policies_remote_multiple():
     policies = RemotePolicy.safe_load_all(dedent("""
         --- !Policy
@@ -1290,24 +1233,6 @@ def test_parse_policies_remote_minimal():
     assert policies[0].rules == []
 
 
-def test_parse_policies_remote_missing_rule_attribute():
-    expected_error = (
-        "Policy 'test': "
-        "Attribute 'rules': "
-        "YAML object !PassingTestCaseRule: "
-        "Attribute 'test_case_name' is required"
-    )
-    with pytest.raises(SafeYAMLError, match=expected_error):
-        RemotePolicy.safe_load_all(dedent("""
-            --- !Policy
-            id: test
-            product_versions: [fedora-rawhide]
-            decision_context: test
-            rules:
-              - !PassingTestCaseRule {test_case: test.case.name}
-        """))
-
-
 def test_policies_to_json():
     policies = Policy.safe_load_all(dedent("""
         --- !Policy
@@ -1333,11 +1258,10 @@ def test_policies_to_json():
     }
 
 
-def test_policy_with_subject_type_component_version(tmpdir):
+def test_policy_with_subject_type_component_version(cached_load_policies):
     nv = '389-ds-base-1.4.0.10'
     subject = create_subject('component-version', nv)
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+    policies_yaml = dedent("""
         --- !Policy
         id: "test-new-subject-type"
         product_versions:
@@ -1347,8 +1271,8 @@ def test_policy_with_subject_type_component_version(tmpdir):
         excluded_packages: []
         rules:
           - !PassingTestCaseRule {test_case_name: test_for_new_type}
-        """))
-    policies = load_policies(tmpdir.strpath)
+        """)
+    policies = cached_load_policies(policies_yaml)
     results = DummyResultsRetriever(subject, 'test_for_new_type', 'PASSED')
     decision = Decision('decision_context_test_component_version', 'fedora-29')
     decision.check(subject, policies, results)
@@ -1356,11 +1280,10 @@ def test_policy_with_subject_type_component_version(tmpdir):
 
 
 @pytest.mark.parametrize('subject_type', ["redhat-module", "redhat-container-image"])
-def test_policy_with_subject_type_redhat_module(tmpdir, subject_type):
+def test_policy_with_subject_type_redhat_module(cached_load_policies, subject_type):
     nsvc = 'httpd:2.4:20181018085700:9edba152'
     subject = create_subject(subject_type, nsvc)
-    p = tmpdir.join('fedora.yaml')
-    p.write(dedent("""
+    policies_yaml = dedent("""
         --- !Policy
         id: "test-new-subject-type"
         product_versions:
@@ -1370,8 +1293,8 @@ def test_policy_with_subject_type_redhat_module(tmpdir, subject_type):
         excluded_packages: []
         rules:
           - !PassingTestCaseRule {test_case_name: test_for_redhat_module_type}
-        """ % subject_type))
-    policies = load_policies(tmpdir.strpath)
+        """ % subject_type)
+    policies = cached_load_policies(policies_yaml)
     results = DummyResultsRetriever(subject, 'test_for_redhat_module_type', 'PASSED')
     decision = Decision('decision_context_test_redhat_module', 'fedora-29')
     decision.check(subject, policies, results)
@@ -1379,7 +1302,8 @@ def test_policy_with_subject_type_redhat_module(tmpdir, subject_type):
 
 
 @pytest.mark.parametrize('namespace', ["rpms", ""])
-def test_remote_rule_policy_on_demand_policy(namespace):
+def test_remote_rule_policy_on_demand_policy(
+        namespace, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction when on_demand policy is given.
     In this case we are just mocking koji """
 
@@ -1406,29 +1330,28 @@ def test_remote_rule_policy_on_demand_policy(namespace):
         - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
 
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = (namespace, 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policy = OnDemandPolicy.create_from_json(serverside_json)
+    mock_retrieve_scm_from_koji.return_value = (
+        namespace, 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    policy = OnDemandPolicy.create_from_json(serverside_json)
 
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath')
-            decision = Decision(None, 'fedora-26')
-            decision.check(subject, [policy], results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
+    # Ensure that presence of a result is success.
+    results = DummyResultsRetriever(subject, 'dist.upgradepath')
+    decision = Decision(None, 'fedora-26')
+    decision.check(subject, [policy], results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
 
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever()
-            decision = Decision(None, 'fedora-26')
-            decision.check(subject, [policy], results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
+    # Ensure that absence of a result is failure.
+    results = DummyResultsRetriever()
+    decision = Decision(None, 'fedora-26')
+    decision.check(subject, [policy], results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
 
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
-            decision = Decision(None, 'fedora-26')
-            decision.check(subject, [policy], results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
+    # And that a result with a failure, is a failure.
+    results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
+    decision = Decision(None, 'fedora-26')
+    decision.check(subject, [policy], results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
 
 
 @pytest.mark.parametrize('two_rules', (True, False))
@@ -1473,7 +1396,8 @@ def test_on_demand_policy_match(two_rules, koji_proxy):
         assert answer_types(decision.answers) == ['test-result-passed']
 
 
-def test_remote_rule_policy_on_demand_policy_required():
+def test_remote_rule_policy_on_demand_policy_required(
+        mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     """ Testing the RemoteRule with the koji interaction when on_demand policy is given.
     In this case we are just mocking koji """
 
@@ -1492,25 +1416,25 @@ def test_remote_rule_policy_on_demand_policy_required():
         ],
     }
 
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = None
+    mock_retrieve_scm_from_koji.return_value = (
+        'rpms', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = None
 
-            policy = OnDemandPolicy.create_from_json(serverside_json)
-            assert len(policy.rules) == 1
-            assert isinstance(policy.rules[0], RemoteRule)
-            assert policy.rules[0].required
+    policy = OnDemandPolicy.create_from_json(serverside_json)
+    assert len(policy.rules) == 1
+    assert isinstance(policy.rules[0], RemoteRule)
+    assert policy.rules[0].required
 
-            results = DummyResultsRetriever()
-            decision = Decision(None, 'fedora-26')
-            decision.check(subject, [policy], results)
-            assert answer_types(decision.answers) == ['missing-gating-yaml']
-            assert not decision.answers[0].is_satisfied
-            assert decision.answers[0].subject.identifier == subject.identifier
+    results = DummyResultsRetriever()
+    decision = Decision(None, 'fedora-26')
+    decision.check(subject, [policy], results)
+    assert answer_types(decision.answers) == ['missing-gating-yaml']
+    assert not decision.answers[0].is_satisfied
+    assert decision.answers[0].subject.identifier == subject.identifier
 
 
-def test_two_rules_no_duplicate(tmpdir):
+def test_two_rules_no_duplicate(
+        cached_load_policies, mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     nvr = 'nethack-1.2.3-1.el9000'
     subject = create_subject('koji_build', nvr)
 
@@ -1536,31 +1460,28 @@ def test_two_rules_no_duplicate(tmpdir):
           - !PassingTestCaseRule {test_case_name: dist.upgradepath}
         """)
 
-    p = tmpdir.join('gating.yaml')
-    p.write(serverside_fragment)
-    with mock.patch('greenwave.resources.retrieve_scm_from_koji') as scm:
-        scm.return_value = ('rmps', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
-        with mock.patch('greenwave.resources.retrieve_yaml_remote_rule') as f:
-            f.return_value = remote_fragment
-            policies = load_policies(tmpdir.strpath)
-
-            # Ensure that presence of a result is success.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
-
-            # Ensure that absence of a result is failure.
-            results = DummyResultsRetriever()
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
-
-            # And that a result with a failure, is a failure.
-            results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
-            decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
-            decision.check(subject, policies, results)
-            assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
+    mock_retrieve_scm_from_koji.return_value = (
+        'rmps', 'nethack', 'c3c47a08a66451cb9686c49f040776ed35a0d1bb')
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    policies = cached_load_policies(serverside_fragment)
+
+    # Ensure that presence of a result is success.
+    results = DummyResultsRetriever(subject, 'dist.upgradepath')
+    decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-passed']
+
+    # Ensure that absence of a result is failure.
+    results = DummyResultsRetriever()
+    decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-missing']
+
+    # And that a result with a failure, is a failure.
+    results = DummyResultsRetriever(subject, 'dist.upgradepath', 'FAILED')
+    decision = Decision('bodhi_update_push_stable_with_remoterule', 'fedora-31')
+    decision.check(subject, policies, results)
+    assert answer_types(decision.answers) == ['fetched-gating-yaml', 'test-result-failed']
 
 
 def test_cache_all_results_temporarily():
@@ -1622,7 +1543,47 @@ def test_cache_passing_results():
     assert cached == retrieved2
 
 
-def test_applicable_policies():
+def test_policy_matches_testcase_skips_passing_test_case_rules():
+    policies = Policy.safe_load_all(dedent("""
+        --- !Policy
+        id: test_policy
+        product_versions: [fedora-rawhide]
+        decision_context: test_context
+        subject_type: koji_build
+        rules:
+          - !PassingTestCaseRule {test_case_name: test.case.1}
+          - !PassingTestCaseRule {test_case_name: test.case.2}
+    """))
+    policy = policies[0]
+
+    assert policy.matches(testcase='test.case.2')
+    with mock.patch.object(PassingTestCaseRule, 'matches') as rule_matches:
+        assert not policy.matches(testcase='test.case.3')
+        rule_matches.assert_not_called()
+
+
+def test_policy_matchers_created_on_load():
+    policies = Policy.safe_load_all(dedent("""
+        --- !Policy
+        id: test_policy
+        product_versions: [fedora-*]
+        decision_context: test_context
+        subject_type: koji_build
+        packages: [net*]
+        excluded_packages: [nethack-extra]
+        rules:
+          - !PassingTestCaseRule {test_case_name: test.case.1}
+    """))
+    policy = policies[0]
+
+    # Policies are shared between threads, so nothing is compiled lazily.
+    with mock.patch('greenwave.policies._compile_fnmatch_patterns') as compile_patterns:
+        assert policy.matches(product_version='fedora-40', testcase='test.case.1')
+        assert not policy.matches(product_version='rhel-9')
+        compile_patterns.assert_not_called()
+
+
+def test_applicable_policies(mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
     policies = Policy.safe_load_all(dedent("""
         --- !Policy
         id: test_policy
@@ -1645,15 +1606,13 @@ def test_applicable_policies():
 
     subject = create_subject('koji_build', 'nethack-1.2.3-1.el9000')
 
-    with mock.patch("greenwave.resources.retrieve_scm_from_koji") as scm:
-        scm.return_value = (
-            "rpms", "nethack", "c3c47a08a66451cb9686c49f040776ed35a0d1bb")
-        with mock.patch("greenwave.resources.retrieve_yaml_remote_rule") as f:
-            f.return_value = remote_fragment
-            result = applicable_decision_context_product_version_pairs(
-                policies,
-                subject=subject,
-                testcase="remote.test.case",
-            )
+    mock_retrieve_scm_from_koji.return_value = (
+        "rpms", "nethack", "c3c47a08a66451cb9686c49f040776ed35a0d1bb")
+    mock_retrieve_yaml_remote_rule.return_value = remote_fragment
+    result = applicable_decision_context_product_version_pairs(
+        policies,
+        subject=subject,
+        testcase="remote.test.case",
+    )
 
     assert len(result) == 1
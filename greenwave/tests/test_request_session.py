@@ -2,6 +2,9 @@
 
 from mock import patch
 from json import loads
+from threading import Thread
+
+import greenwave.resources
 from greenwave.request_session import get_requests_session
 from requests.exceptions import ConnectionError
 
@@ -14,3 +17,16 @@ def test_retry_handler(mocked_request):
     resp = session.get('http://localhost.localdomain')
     assert resp.status_code == 502
     assert loads(resp.content) == {'message': msg_text}
+
+
+def test_requests_session_per_thread():
+    # pylint: disable=protected-access
+    session = greenwave.resources._requests_session()
+    assert greenwave.resources._requests_session() is session
+
+    other_sessions = []
+    thread = Thread(
+        target=lambda: other_sessions.append(greenwave.resources._requests_session()))
+    thread.start()
+    thread.join()
+    assert other_sessions[0] is not session
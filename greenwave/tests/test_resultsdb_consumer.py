@@ -538,6 +538,68 @@ def test_decision_change_for_composes(
         }
 
 
+def test_decision_change_for_multiple_decision_contexts(
+        koji_proxy,
+        mock_retrieve_results):
+    """
+    Test publishing decision change messages for each applicable decision
+    context in sorted order.
+    """
+    publish = 'greenwave.consumers.consumer.fedora_messaging.api.publish'
+    with mock.patch(publish) as mock_fedora_messaging:
+        policies = dedent("""
+            --- !Policy
+            id: "compose_gate"
+            product_versions:
+              - rhel-8
+            decision_contexts:
+              - context_b
+              - context_a
+              - context_c
+            subject_type: compose
+            rules:
+              - !PassingTestCaseRule {test_case_name: rtt.installability.validation}
+        """)
+
+        result = {
+            'id': 1,
+            'testcase': {'name': 'rtt.installability.validation'},
+            'outcome': 'PASSED',
+            'data': {
+                "item": ["RHEL-9000/unknown/x86_64"],
+                "productmd.compose.id": ["RHEL-9000"],
+                "type": ["compose"]
+            },
+            "submit_time": "2021-02-15T13:31:35.000001"
+        }
+        mock_retrieve_results.return_value = [result]
+
+        koji_proxy.getBuild.return_value = None
+
+        message = {
+            'body': {
+                'topic': 'resultsdb.result.new',
+                'msg': result,
+            }
+        }
+        hub = mock.MagicMock()
+        hub.config = {
+            'environment': 'environment',
+            'topic_prefix': 'topic_prefix',
+        }
+        handler = greenwave.consumers.resultsdb.ResultsDBHandler(hub)
+
+        handler.flask_app.config['policies'] = Policy.safe_load_all(policies)
+        with handler.flask_app.app_context():
+            handler.consume(message)
+
+        contexts = [
+            mock_call[1][0].body['decision_context']
+            for mock_call in mock_fedora_messaging.mock_calls
+        ]
+        assert contexts == ['context_a', 'context_b', 'context_c']
+
+
 def test_real_fedora_messaging_msg(mock_retrieve_results):
     message = {
         'msg': {
@@ -721,3 +783,36 @@ def test_container_brew_build(mock_retrieve_results, koji_proxy):
             'subject_identifier': 'example-container',
             'previous': None,
         }
+
+
+def test_subject_type_policies():
+    # pylint: disable=protected-access
+    policies = dedent("""
+        --- !Policy
+        id: koji_policy
+        product_versions: [fedora-rawhide]
+        decision_context: test_context
+        subject_type: koji_build
+        rules: []
+        --- !Policy
+        id: compose_policy
+        product_versions: [fedora-rawhide]
+        decision_context: test_context
+        subject_type: compose
+        rules: []
+    """)
+    hub = mock.MagicMock()
+    hub.config = {
+        'environment': 'environment',
+        'topic_prefix': 'topic_prefix',
+    }
+    handler = greenwave.consumers.resultsdb.ResultsDBHandler(hub)
+    handler.flask_app.config['policies'] = Policy.safe_load_all(policies)
+    with handler.flask_app.app_context():
+        subject = create_subject('brew-build', 'nethack-1.2.3-1.rawhide')
+        subject_policies = handler._subject_type_policies(subject)
+        assert [policy.id for policy in subject_policies] == ['koji_policy']
+        assert handler._subject_type_policies(subject) is subject_policies
+
+        handler.flask_app.config['policies'] = []
+        assert handler._subject_type_policies(subject) == []
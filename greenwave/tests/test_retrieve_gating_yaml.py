@@ -1,8 +1,12 @@
 # SPDX-License-Identifier: GPL-2.0+
 
+import mock
 import re
 import socket
-from requests.exceptions import ConnectionError
+import requests
+from requests.exceptions import ChunkedEncodingError, ConnectionError
+
+import greenwave.resources
 
 import pytest
 from werkzeug.exceptions import BadGateway, NotFound
@@ -10,6 +14,9 @@ from werkzeug.exceptions import BadGateway, NotFound
 from greenwave.resources import (
     NoSourceException,
     KojiScmUrlParseError,
+    prefetch_koji_builds,
+    retrieve_koji_build_creation_time,
+    retrieve_koji_build_task_id,
     retrieve_scm_from_koji,
     retrieve_yaml_remote_rule,
 )
@@ -137,6 +144,41 @@ def test_retrieve_yaml_remote_rule_no_namespace(app, requests_mock):
     assert returned_file is None
 
 
+def test_retrieve_yaml_remote_rule_single_request(app, requests_mock):
+    url = 'https://src.fedoraproject.org/rpms/pkg/raw/deadbeaf/f/gating.yaml'
+    requests_mock.get(url, content=b'--- !Policy\n')
+
+    returned_file = retrieve_yaml_remote_rule(url)
+
+    request_history = [(r.method, r.url) for r in requests_mock.request_history]
+    assert request_history == [('GET', url)]
+    assert 'Content-Type' not in requests_mock.request_history[0].headers
+    assert returned_file == b'--- !Policy\n'
+
+
+def test_retrieve_yaml_remote_rule_too_large(app, requests_mock):
+    url = 'https://src.fedoraproject.org/rpms/pkg/raw/deadbeaf/f/gating.yaml'
+    requests_mock.get(url, content=b'#' * 11)
+    app.config['REMOTE_RULE_MAX_SIZE'] = 10
+
+    expected_error = re.escape(
+        f'Remote rule file {url} exceeds maximum size of 10 bytes')
+    with pytest.raises(BadGateway, match=expected_error):
+        retrieve_yaml_remote_rule(url)
+
+
+def test_retrieve_yaml_remote_rule_read_error(app, requests_mock):
+    url = 'https://src.fedoraproject.org/rpms/pkg/raw/deadbeaf/f/gating.yaml'
+    requests_mock.get(url, content=b'--- !Policy\n')
+    exc = ChunkedEncodingError('Connection broken')
+
+    expected_error = re.escape(
+        f'Failed to read remote rule file {url}: Connection broken')
+    with mock.patch.object(requests.Response, 'iter_content', side_effect=exc):
+        with pytest.raises(BadGateway, match=expected_error):
+            retrieve_yaml_remote_rule(url)
+
+
 def test_retrieve_yaml_remote_rule_connection_error(app, requests_mock):
     exc = ConnectionError('Something went terribly wrong...')
     requests_mock.get('https://src.fedoraproject.org/pkg/raw/deadbeaf/f/gating.yaml', exc=exc)
@@ -159,3 +201,87 @@ def test_retrieve_scm_from_koji_build_socket_error(app, koji_proxy):
     expected_error = 'Could not reach Koji: Socket is closed'
     with pytest.raises(socket.error, match=expected_error):
         retrieve_scm_from_koji(nvr)
+
+
+def test_retrieve_scm_from_koji_reuses_server_proxy(app, koji_proxy):
+    koji_proxy.getBuild.return_value = {
+        'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#deadbeef'
+    }
+    retrieve_scm_from_koji('nethack-3.6.1-3.fc29')
+    retrieve_scm_from_koji('nethack-3.6.1-4.fc29')
+    assert koji_proxy.getBuild.call_count == 2
+    greenwave.resources.get_server_proxy.assert_called_once()
+
+
+def test_retrieve_koji_build_attributes_once_per_context(app, koji_proxy):
+    nvr = 'nethack-3.6.1-3.fc29'
+    koji_proxy.getBuild.return_value = {
+        'task_id': 123,
+        'creation_time': '2019-03-25 16:34:41.882620',
+        'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#deadbeef',
+    }
+    koji_url = app.config['KOJI_BASE_URL']
+    assert retrieve_koji_build_task_id(nvr, koji_url) == 123
+    assert retrieve_koji_build_creation_time(nvr, koji_url).year == 2019
+    assert retrieve_scm_from_koji(nvr) == ('rpms', 'nethack', 'deadbeef')
+    koji_proxy.getBuild.assert_called_once_with(nvr)
+
+
+def test_prefetch_koji_builds(app, koji_proxy):
+    nvrs = ['nethack-3.6.1-3.fc29', 'nethack-3.6.1-4.fc29', 'missing-1-1.fc29']
+    koji_proxy.system.multicall.return_value = [
+        [{'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#deadbeef'}],
+        [{'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#c0ffee'}],
+        [None],
+    ]
+    prefetch_koji_builds(nvrs, app.config['KOJI_BASE_URL'])
+    koji_proxy.system.multicall.assert_called_once_with([
+        {'methodName': 'getBuild', 'params': (nvr,)} for nvr in nvrs
+    ])
+
+    assert retrieve_scm_from_koji(nvrs[0]) == ('rpms', 'nethack', 'deadbeef')
+    assert retrieve_scm_from_koji(nvrs[1]) == ('rpms', 'nethack', 'c0ffee')
+    koji_proxy.getBuild.assert_not_called()
+
+    koji_proxy.getBuild.return_value = {}
+    with pytest.raises(NotFound):
+        retrieve_scm_from_koji(nvrs[2])
+    koji_proxy.getBuild.assert_called_once_with(nvrs[2])
+
+
+def test_prefetch_koji_builds_uses_cache(app, koji_proxy):
+    app.cache.configure('dogpile.cache.memory', replace_existing_backend=True)
+    koji_url = app.config['KOJI_BASE_URL']
+    nvrs = ['nethack-3.6.1-3.fc29', 'nethack-3.6.1-4.fc29', 'nethack-3.6.1-5.fc29']
+    koji_proxy.getBuild.return_value = {
+        'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#deadbeef',
+    }
+    koji_proxy.system.multicall.return_value = [
+        [{'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#c0ffee'}],
+        [{'source': 'git+https://src.fedoraproject.org/rpms/nethack.git#f00d'}],
+    ]
+    with app.app_context():
+        assert retrieve_scm_from_koji(nvrs[0]) == ('rpms', 'nethack', 'deadbeef')
+
+    with app.app_context():
+        prefetch_koji_builds(nvrs, koji_url)
+    koji_proxy.system.multicall.assert_called_once_with([
+        {'methodName': 'getBuild', 'params': (nvr,)} for nvr in nvrs[1:]
+    ])
+
+    with app.app_context():
+        prefetch_koji_builds(nvrs, koji_url)
+        assert retrieve_scm_from_koji(nvrs[1]) == ('rpms', 'nethack', 'c0ffee')
+        assert retrieve_scm_from_koji(nvrs[2]) == ('rpms', 'nethack', 'f00d')
+    koji_proxy.system.multicall.assert_called_once()
+    koji_proxy.getBuild.assert_called_once_with(nvrs[0])
+
+
+def test_retrieve_yaml_remote_rule_caches_missing_file(app, requests_mock):
+    app.cache.configure('dogpile.cache.memory', replace_existing_backend=True)
+    url = 'https://src.fedoraproject.org/rpms/pkg/raw/deadbeaf/f/gating.yaml'
+    requests_mock.get(url, status_code=404)
+
+    assert retrieve_yaml_remote_rule(url) is None
+    assert retrieve_yaml_remote_rule(url) is None
+    assert len(requests_mock.request_history) == 1
@@ -7,7 +7,6 @@ from textwrap import dedent
 from defusedxml.xmlrpc import xmlrpc_client
 from werkzeug.exceptions import BadGateway, NotFound
 
-from greenwave.app_factory import create_app
 from greenwave.decision import Decision
 from greenwave.policies import Policy, RemoteRule
 from greenwave.resources import NoSourceException
@@ -39,7 +38,7 @@ def test_match_passing_test_case_rule():
 
 @mock.patch('greenwave.resources.retrieve_yaml_remote_rule')
 @mock.patch('greenwave.resources.retrieve_scm_from_koji')
-def test_match_remote_rule(mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
+def test_match_remote_rule(mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -59,31 +58,29 @@ def test_match_remote_rule(mock_retrieve_scm_from_koji, mock_retrieve_yaml_remot
     nvr = 'nethack-1.2.3-1.el9000'
     mock_retrieve_scm_from_koji.return_value = ('rpms', nvr, '123')
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        assert len(policies) == 1
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    assert len(policies) == 1
 
-        policy = policies[0]
-        assert len(policy.rules) == 1
+    policy = policies[0]
+    assert len(policy.rules) == 1
 
-        rule = policy.rules[0]
-        assert rule.matches(policy)
-        assert rule.matches(policy, subject=subject)
-        assert rule.matches(policy, subject=subject, testcase='some_test_case')
-        assert not rule.matches(policy, subject=subject, testcase='other_test_case')
-        assert rule.matches(
-            policy,
-            subject=subject,
-            testcase='other_test_case',
-            match_any_remote_rule=True,
-        )
+    rule = policy.rules[0]
+    assert rule.matches(policy)
+    assert rule.matches(policy, subject=subject)
+    assert rule.matches(policy, subject=subject, testcase='some_test_case')
+    assert not rule.matches(policy, subject=subject, testcase='other_test_case')
+    assert rule.matches(
+        policy,
+        subject=subject,
+        testcase='other_test_case',
+        match_any_remote_rule=True,
+    )
 
 
 @mock.patch('greenwave.resources.retrieve_yaml_remote_rule')
 @mock.patch('greenwave.resources._koji')
-def test_invalid_nvr_iden(koji, mock_retrieve_yaml_remote_rule):
+def test_invalid_nvr_iden(koji, mock_retrieve_yaml_remote_rule, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -96,22 +93,20 @@ def test_invalid_nvr_iden(koji, mock_retrieve_yaml_remote_rule):
     nvr = 'nieco'
     koji().getBuild.side_effect = xmlrpc_client.Fault(1000, 'invalid format')
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        policy = policies[0]
-        rule = policy.rules[0]
-        expected_error = re.escape(
-            f'Failed to get Koji build for "{nvr}": invalid format (code: 1000)')
-        with pytest.raises(BadGateway, match=expected_error):
-            sub_policies, answers = rule._get_sub_policies(policy, subject)
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    policy = policies[0]
+    rule = policy.rules[0]
+    expected_error = re.escape(
+        f'Failed to get Koji build for "{nvr}": invalid format (code: 1000)')
+    with pytest.raises(BadGateway, match=expected_error):
+        sub_policies, answers = rule._get_sub_policies(policy, subject)
 
 
 @mock.patch('greenwave.resources.retrieve_yaml_remote_rule')
 @mock.patch('greenwave.resources.retrieve_scm_from_koji')
 def test_remote_rule_include_failures(
-        mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule):
+        mock_retrieve_scm_from_koji, mock_retrieve_yaml_remote_rule, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -124,38 +119,36 @@ def test_remote_rule_include_failures(
     nvr = 'nethack-1.2.3-1.el9000'
     mock_retrieve_scm_from_koji.return_value = ('rpms', nvr, '123')
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        assert len(policies) == 1
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    assert len(policies) == 1
 
-        policy = policies[0]
-        assert len(policy.rules) == 1
+    policy = policies[0]
+    assert len(policy.rules) == 1
 
-        rule = policy.rules[0]
+    rule = policy.rules[0]
 
-        # Include any failure fetching/parsing remote rule file in the
-        # decision.
-        mock_retrieve_yaml_remote_rule.return_value = "--- !Policy"
-        assert rule.matches(policy, subject=subject, testcase='other_test_case')
-        decision = Decision('bodhi_update_push_stable', 'rhel-9000')
-        decision.check(subject, policies, results_retriever=None)
-        assert len(decision.answers) == 2
-        assert decision.answers[1].test_case_name == 'invalid-gating-yaml'
+    # Include any failure fetching/parsing remote rule file in the
+    # decision.
+    mock_retrieve_yaml_remote_rule.return_value = "--- !Policy"
+    assert rule.matches(policy, subject=subject, testcase='other_test_case')
+    decision = Decision('bodhi_update_push_stable', 'rhel-9000')
+    decision.check(subject, policies, results_retriever=None)
+    assert len(decision.answers) == 2
+    assert decision.answers[1].test_case_name == 'invalid-gating-yaml'
 
-        # Reload rules to clear cache.
-        policies = Policy.safe_load_all(policy_yaml)
-        mock_retrieve_scm_from_koji.side_effect = NotFound
-        assert rule.matches(policy, subject=subject, testcase='other_test_case')
-        decision = Decision('bodhi_update_push_stable', 'rhel-9000')
-        decision.check(subject, policies, results_retriever=None)
-        assert [x.to_json()['type'] for x in decision.answers] == ['failed-fetch-gating-yaml']
-        assert decision.answers[0].error == f'Koji build not found for {subject}'
+    # Reload rules to clear cache.
+    policies = Policy.safe_load_all(policy_yaml)
+    mock_retrieve_scm_from_koji.side_effect = NotFound
+    assert rule.matches(policy, subject=subject, testcase='other_test_case')
+    decision = Decision('bodhi_update_push_stable', 'rhel-9000')
+    decision.check(subject, policies, results_retriever=None)
+    assert [x.to_json()['type'] for x in decision.answers] == ['failed-fetch-gating-yaml']
+    assert decision.answers[0].error == f'Koji build not found for {subject}'
 
 
 @mock.patch('greenwave.resources.retrieve_scm_from_koji')
-def test_remote_rule_exclude_no_source(mock_retrieve_scm_from_koji):
+def test_remote_rule_exclude_no_source(mock_retrieve_scm_from_koji, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -167,25 +160,23 @@ def test_remote_rule_exclude_no_source(mock_retrieve_scm_from_koji):
     """)
     nvr = 'nethack-1.2.3-1.el9000'
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        assert len(policies) == 1
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    assert len(policies) == 1
 
-        policy = policies[0]
-        assert len(policy.rules) == 1
+    policy = policies[0]
+    assert len(policy.rules) == 1
 
-        rule = policy.rules[0]
+    rule = policy.rules[0]
 
-        mock_retrieve_scm_from_koji.side_effect = NoSourceException
-        assert rule.matches(policy, subject=subject)
-        assert rule.matches(policy, subject=subject, testcase='some_test_case')
-        assert rule.matches(policy, subject=subject, testcase='other_test_case')
+    mock_retrieve_scm_from_koji.side_effect = NoSourceException
+    assert rule.matches(policy, subject=subject)
+    assert rule.matches(policy, subject=subject, testcase='some_test_case')
+    assert rule.matches(policy, subject=subject, testcase='other_test_case')
 
-        decision = Decision('bodhi_update_push_stable', 'rhel-9000')
-        decision.check(subject, policies, results_retriever=None)
-        assert decision.answers == []
+    decision = Decision('bodhi_update_push_stable', 'rhel-9000')
+    decision.check(subject, policies, results_retriever=None)
+    assert decision.answers == []
 
 
 @pytest.mark.parametrize(('required_flag', 'required_value'), (
@@ -271,7 +262,7 @@ def test_remote_rule_valid_date_bad(prop, value):
     ('valid_since: 2021-10-07, valid_until: 2021-10-08', False),
     ('valid_since: 2021-10-05, valid_until: 2021-10-06', False),
 ))
-def test_passing_test_case_rule_valid_times(koji_proxy, properties, is_valid):
+def test_passing_test_case_rule_valid_times(koji_proxy, properties, is_valid, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -284,29 +275,27 @@ def test_passing_test_case_rule_valid_times(koji_proxy, properties, is_valid):
 
     nvr = 'nethack-1.2.3-1.el9000'
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        assert len(policies) == 1
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    assert len(policies) == 1
 
-        policy = policies[0]
-        assert len(policy.rules) == 1
+    policy = policies[0]
+    assert len(policy.rules) == 1
 
-        rule = policy.rules[0]
+    rule = policy.rules[0]
 
-        assert rule.matches(policy, subject=subject)
-        assert rule.matches(policy, subject=subject, testcase='some_test_case')
+    assert rule.matches(policy, subject=subject)
+    assert rule.matches(policy, subject=subject, testcase='some_test_case')
 
-        koji_proxy.getBuild.return_value = {
-            'creation_time': '2021-10-06 06:00:00.000000+00:00'}
-        decision = Decision('bodhi_update_push_stable', 'rhel-9000')
+    koji_proxy.getBuild.return_value = {
+        'creation_time': '2021-10-06 06:00:00.000000+00:00'}
+    decision = Decision('bodhi_update_push_stable', 'rhel-9000')
 
-        results_retriever = mock.MagicMock()
-        results_retriever.retrieve.return_value = []
-        decision.check(subject, policies, results_retriever=results_retriever)
-        answers = ['test-result-missing'] if is_valid else []
-        assert [x.to_json()['type'] for x in decision.answers] == answers
+    results_retriever = mock.MagicMock()
+    results_retriever.retrieve.return_value = []
+    decision.check(subject, policies, results_retriever=results_retriever)
+    answers = ['test-result-missing'] if is_valid else []
+    assert [x.to_json()['type'] for x in decision.answers] == answers
 
 
 @pytest.mark.parametrize(('creation_time', 'test_case_name'), (
@@ -314,7 +303,7 @@ def test_passing_test_case_rule_valid_times(koji_proxy, properties, is_valid):
     ('2021-10-06 06:00:00.000000+00:00', 'new_test_case'),
 ))
 def test_passing_test_case_rule_replace_using_valid_times(
-        koji_proxy, creation_time, test_case_name):
+        koji_proxy, creation_time, test_case_name, app):
     policy_yaml = dedent("""
         --- !Policy
         id: "some_policy"
@@ -332,23 +321,21 @@ def test_passing_test_case_rule_replace_using_valid_times(
 
     nvr = 'nethack-1.2.3-1.el9000'
 
-    app = create_app('greenwave.config.TestingConfig')
-    with app.app_context():
-        subject = create_subject('koji_build', nvr)
-        policies = Policy.safe_load_all(policy_yaml)
-        assert len(policies) == 1
+    subject = create_subject('koji_build', nvr)
+    policies = Policy.safe_load_all(policy_yaml)
+    assert len(policies) == 1
 
-        policy = policies[0]
-        assert len(policy.rules) == 2
+    policy = policies[0]
+    assert len(policy.rules) == 2
 
-        koji_proxy.getBuild.return_value = {'creation_time': creation_time}
-        decision = Decision('bodhi_update_push_stable', 'rhel-9000')
+    koji_proxy.getBuild.return_value = {'creation_time': creation_time}
+    decision = Decision('bodhi_update_push_stable', 'rhel-9000')
 
-        results_retriever = mock.MagicMock()
-        results_retriever.retrieve.return_value = []
-        decision.check(subject, policies, results_retriever=results_retriever)
-        assert [x.to_json()['type'] for x in decision.answers] == ['test-result-missing']
-        assert decision.answers[0].test_case_name == test_case_name
+    results_retriever = mock.MagicMock()
+    results_retriever.retrieve.return_value = []
+    decision.check(subject, policies, results_retriever=results_retriever)
+    assert [x.to_json()['type'] for x in decision.answers] == ['test-result-missing']
+    assert decision.answers[0].test_case_name == test_case_name
 
 
 @mock.patch('greenwave.resources.retrieve_yaml_remote_rule')
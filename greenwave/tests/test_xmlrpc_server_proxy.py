@@ -32,3 +32,14 @@ def test_get_server_proxy(
     elif expected_transport == xmlrpc_server_proxy.SafeTransport:
         mock_safe_transport.__init__.assert_called_once_with(url, expected_timeout)
         mock_transport.__init__.assert_not_called()
+
+
+@pytest.mark.parametrize('transport_class', (
+    xmlrpc_server_proxy.Transport,
+    xmlrpc_server_proxy.SafeTransport,
+))
+def test_transport_reuses_connection(transport_class):
+    transport = transport_class(timeout=15)
+    connection = transport.make_connection('localhost:5000')
+    assert connection.timeout == 15
+    assert transport.make_connection('localhost:5000') is connection
@@ -14,6 +14,9 @@ def get_server_proxy(uri, timeout):
 
     This is a workaround for https://bugs.python.org/issue14134.
 
+    The transport keeps the HTTP connection to the server alive between
+    calls, so the returned proxy should be reused for subsequent calls.
+
     Args:
         uri (str): The connection point on the server in the format of scheme://host/target.
         timeout (int): The timeout to set on the transport socket.